@@ -0,0 +1,12 @@
+"""Benchmarks for the site generator.
+
+Run them from the repository root, e.g. `python -m bench.memory`. Importing
+this package puts `src/` on the import path, the same way `src/main.py`
+sees its sibling modules.
+"""
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
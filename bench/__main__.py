@@ -0,0 +1,167 @@
+"""Build throughput benchmark.
+
+Usage: python -m bench [--sizes 100,1000,10000,100000] [--jobs N]
+                       [--save baseline.json] [--compare baseline.json]
+
+For each size a synthetic site is generated in a temporary directory and
+every pipeline stage is timed over all of its pages. Each size runs in its
+own process so the reported peak RSS belongs to that size alone.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bench  # noqa: F401  (puts src/ on sys.path)
+from bench.synthetic import generate_site
+from blocknode import BlockType, block_to_block_type
+from build import generate_pages_recursive
+from process_markdown import (collect_pages, extract_title, markdown_to_blocks, markdown_to_document,
+                              markdown_to_html_node, text_to_textnodes)
+
+STAGES = [
+    "read",
+    "extract_title",
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "markdown_to_html_node",
+    "to_html",
+    "markdown_to_document",
+    "document_to_html",
+    "generate_pages_recursive",
+]
+DEFAULT_SIZES = [100, 1000]
+DEFAULT_THRESHOLD = 0.10
+
+
+def _timed(func, items, repeat=1):
+    """Returns the best of `repeat` timings of func over items, and the results."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [func(item) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
+def run_size(pages, jobs=1, seed=0, repeat=3):
+    """Times every stage on a synthetic site of `pages` pages, keeping the best of `repeat` runs."""
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, template_path = generate_site(root, pages, seed)
+        paths = [from_path for from_path, _ in collect_pages(content_dir, "")]
+        seconds = {}
+
+        seconds["read"], texts = _timed(_read, paths, repeat)
+        seconds["extract_title"], _ = _timed(extract_title, texts, repeat)
+        seconds["markdown_to_blocks"], page_blocks = _timed(markdown_to_blocks, texts, repeat)
+        blocks = [block for page in page_blocks for block in page]
+        seconds["block_to_block_type"], block_types = _timed(block_to_block_type, blocks, repeat)
+        paragraphs = [' '.join(block.split('\n'))
+                      for block, block_type in zip(blocks, block_types) if block_type == BlockType.PARAGRAPH]
+        seconds["text_to_textnodes"], _ = _timed(text_to_textnodes, paragraphs, repeat)
+        seconds["markdown_to_html_node"], nodes = _timed(markdown_to_html_node, texts, repeat)
+        seconds["to_html"], _ = _timed(lambda node: node.to_html(), nodes, repeat)
+        seconds["markdown_to_document"], documents = _timed(markdown_to_document, texts, repeat)
+        seconds["document_to_html"], _ = _timed(lambda document: document.to_html(), documents, repeat)
+
+        dest_dir = os.path.join(root, "docs")
+        seconds["generate_pages_recursive"], _ = _timed(
+            lambda _: generate_pages_recursive(content_dir, template_path, dest_dir, "/", jobs=jobs),
+            [None], repeat)
+
+    return {
+        "pages": pages,
+        "jobs": jobs,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "stages": {
+            stage: {"seconds": round(seconds[stage], 6),
+                    "pages_per_sec": round(pages / seconds[stage], 1) if seconds[stage] else None}
+            for stage in STAGES
+        },
+    }
+
+
+def print_report(results, baseline=None):
+    """Prints pages/sec per stage, with the change against a baseline when given."""
+    baseline = {entry["pages"]: entry for entry in (baseline or {}).get("results", [])}
+    for result in results:
+        print(f"\n{result['pages']} pages, jobs={result['jobs']}, peak RSS {result['peak_rss_kb'] / 1024:.1f} MiB")
+        print(f"  {'stage':<26} {'seconds':>10} {'pages/sec':>12} {'vs baseline':>12}")
+        previous = baseline.get(result["pages"])
+        for stage in STAGES:
+            current = result["stages"][stage]
+            change = ""
+            if previous and previous["stages"].get(stage, {}).get("pages_per_sec"):
+                ratio = current["pages_per_sec"] / previous["stages"][stage]["pages_per_sec"]
+                change = f"{(ratio - 1) * 100:+.1f}%"
+            print(f"  {stage:<26} {current['seconds']:>10.4f} {current['pages_per_sec']:>12.1f} {change:>12}")
+
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns (pages, stage, ratio) for every stage slower than the baseline by more than threshold."""
+    previous = {entry["pages"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        entry = previous.get(result["pages"])
+        if entry is None:
+            continue
+        for stage in STAGES:
+            before = entry["stages"].get(stage, {}).get("pages_per_sec")
+            after = result["stages"][stage]["pages_per_sec"]
+            if before and after and after < before * (1 - threshold):
+                regressions.append((result["pages"], stage, after / before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the build pipeline on synthetic sites.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated page counts (e.g. 100,1000,10000,100000)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="jobs for the full-build stage")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic content")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the fastest is kept")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fractional slowdown that counts as a regression (default 0.10)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = []
+    for pages in sizes:
+        # A fresh process per size keeps peak RSS figures independent
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results.append(executor.submit(run_size, pages, args.jobs, args.seed, args.repeat).result())
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, args.threshold)
+        for pages, stage, ratio in regressions:
+            print(f"REGRESSION: {stage} at {pages} pages runs at {ratio * 100:.0f}% of baseline")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
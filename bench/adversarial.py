@@ -0,0 +1,47 @@
+"""Pathological-input benchmark.
+
+Usage: python -m bench.adversarial [--sizes N ...] [--repeat N]
+
+Runs every input of the adversarial corpus in src/test_adversarial.py at
+growing sizes and reports how the time grows. Linear paths grow roughly
+with the size; a growth close to its square points at backtracking or
+rescanning.
+"""
+import argparse
+import time
+
+import bench  # noqa: F401  (puts src/ on sys.path)
+from test_adversarial import CORPUS
+
+
+def best_time(func, text, repeat=3):
+    """Returns the fastest of several runs of func(text), in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            func(text)
+        except ValueError:
+            pass
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the parser on pathological inputs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 40000, 160000],
+                        help="repetitions of each adversarial pattern (default 10000 40000 160000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is kept")
+    args = parser.parse_args()
+
+    header = "".join(f"{size:>12}" for size in args.sizes)
+    print(f"{'input':<32}{header}{'growth':>9}")
+    for name, func, make in CORPUS:
+        times = [best_time(func, make(size), args.repeat) for size in args.sizes]
+        growth = times[-1] / times[0] if times[0] else float("inf")
+        cells = "".join(f"{seconds * 1000:>9.1f} ms" for seconds in times)
+        print(f"{name:<32}{cells}{growth:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""HTML escaping overhead benchmark.
+
+Usage: python -m bench.escape [--pages N] [--repeat N]
+
+Times escape_text on clean and dirty strings against html.escape, then
+serializes a synthetic site's node trees with and without escaping to show
+what escaping adds to to_html in the common, clean-text case.
+"""
+import argparse
+import html
+import tempfile
+import timeit
+from unittest import mock
+
+import bench  # noqa: F401  (puts src/ on sys.path)
+import leafnode
+from bench.synthetic import generate_site
+from htmlnode import escape_text
+from process_markdown import collect_pages, markdown_to_html_node
+
+CLEAN = "An ordinary sentence of prose, with punctuation but nothing to escape."
+DIRTY = "if a < b && b > c: print('<done>')"
+
+
+def per_call(func, value, number=200000):
+    """Returns the best time of one call, in nanoseconds."""
+    return min(timeit.repeat(lambda: func(value), number=number, repeat=5)) / number * 1e9
+
+
+def serialize(nodes, repeat):
+    """Returns the best time to call to_html on every node."""
+    return min(timeit.repeat(lambda: [node.to_html() for node in nodes], number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of HTML escaping.")
+    parser.add_argument("--pages", type=int, default=1000, help="synthetic pages to serialize")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement; the fastest is kept")
+    args = parser.parse_args()
+
+    print(f"{'string':<8} {'escape_text':>14} {'html.escape':>14}")
+    for name, value in (("clean", CLEAN), ("dirty", DIRTY)):
+        print(f"{name:<8} {per_call(escape_text, value):>11.0f} ns {per_call(html.escape, value):>11.0f} ns")
+
+    with tempfile.TemporaryDirectory() as root:
+        content_dir, _ = generate_site(root, args.pages)
+        nodes = []
+        for from_path, _ in collect_pages(content_dir, ""):
+            with open(from_path, 'r') as f:
+                nodes.append(markdown_to_html_node(f.read()))
+
+    serialize(nodes, 1)  # warm up, so the first measurement is not penalized
+    escaped = serialize(nodes, args.repeat)
+    with mock.patch.object(leafnode, "escape_text", str):
+        raw = serialize(nodes, args.repeat)
+    print()
+    print(f"to_html over {args.pages} pages: {escaped:.4f} s escaped, {raw:.4f} s raw "
+          f"({(escaped / raw - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Link and image extraction benchmark.
+
+Usage: python -m bench.links [--links N ...] [--repeat N]
+
+Builds a link-dense paragraph (mixing links, images and parenthesized
+URLs) for each size and times text_to_textnodes and the
+split_nodes_image/split_nodes_link pair on it. For comparison it also
+times the former extraction, a lazy-regex findall followed by one
+str.split per match, which rescans the rest of the text for every link.
+"""
+import argparse
+import re
+import timeit
+
+import bench  # noqa: F401  (puts src/ on sys.path)
+from process_markdown import split_nodes_image, split_nodes_link, text_to_textnodes
+from textnode import TextNode, TextType
+
+
+def link_dense_text(count):
+    """Returns a paragraph with `count` links and images."""
+    parts = []
+    for i in range(count):
+        if i % 10 == 9:
+            parts.append(f"see ![figure {i}](/images/{i}.png)")
+        elif i % 10 == 5:
+            parts.append(f"see [entry {i}](https://en.wikipedia.org/wiki/Entry_({i}))")
+        else:
+            parts.append(f"see [page {i}](/pages/{i}.html)")
+    return ", ".join(parts)
+
+
+def legacy_split_nodes_link(old_nodes):
+    """The previous split_nodes_link, kept only as a baseline."""
+    new_nodes = []
+    for node in old_nodes:
+        if node.text_type != TextType.TEXT:
+            new_nodes.append(node)
+            continue
+        text = node.text
+        for alt, url in re.findall(r'(?<!\!)\[(.*?)\]\((.*?)\)', text):
+            before, text = text.split(f"[{alt}]({url})", 1)
+            if before:
+                new_nodes.append(TextNode(before, TextType.TEXT))
+            new_nodes.append(TextNode(alt, TextType.LINK, url))
+        if text:
+            new_nodes.append(TextNode(text, TextType.TEXT))
+    return new_nodes
+
+
+def best(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time link and image extraction on link-dense text.")
+    parser.add_argument("--links", type=int, nargs="+", default=[1000, 10000, 20000],
+                        help="links per paragraph (default 1000 10000 20000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is kept")
+    args = parser.parse_args()
+
+    print(f"{'links':>7} {'text_to_textnodes':>18} {'split_nodes_*':>14} {'legacy split':>13}")
+    for count in args.links:
+        text = link_dense_text(count)
+        nodes = [TextNode(text, TextType.TEXT)]
+        tokenize = best(lambda: text_to_textnodes(text), args.repeat)
+        split = best(lambda: split_nodes_link(split_nodes_image(nodes)), args.repeat)
+        legacy = best(lambda: legacy_split_nodes_link(nodes), args.repeat)
+        print(f"{count:>7} {tokenize * 1000:>15.1f} ms {split * 1000:>11.1f} ms {legacy * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Memory and allocation benchmark for the slotted node classes.
+
+Usage: python -m bench.memory [content_dir]
+
+For every markdown page it reports the node count, the bytes allocated by
+markdown_to_html_node and how many bytes the same nodes would take with a
+per-instance __dict__, using unslotted stand-ins measured the same way.
+"""
+import argparse
+import os
+import tracemalloc
+
+import bench  # noqa: F401  (puts src/ on sys.path)
+from leafnode import LeafNode
+from parentnode import ParentNode
+from process_markdown import collect_pages, markdown_to_html_node
+from textnode import TextNode, TextType
+
+
+class _DictHTMLNode:
+    """Unslotted stand-in with the HTMLNode attribute layout."""
+
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class _DictTextNode:
+    """Unslotted stand-in with the TextNode attribute layout."""
+
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+def bytes_per_instance(factory, count=20000):
+    """Measures the average traced allocation of one instance."""
+    objects = [None] * count
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        objects[i] = factory()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def count_nodes(node):
+    """Returns (parent_count, leaf_count) for an HTMLNode tree."""
+    parents = leaves = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ParentNode):
+            parents += 1
+            stack.extend(node.children)
+        else:
+            leaves += 1
+    return parents, leaves
+
+
+def measure_page(path):
+    """Returns node counts and traced allocation figures for one page."""
+    with open(path, 'r') as f:
+        markdown = f.read()
+    tracemalloc.start()
+    node = markdown_to_html_node(markdown)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    parents, leaves = count_nodes(node)
+    return {"path": path, "parents": parents, "leaves": leaves, "retained": current, "peak": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page node memory benchmark.")
+    parser.add_argument("content", nargs="?", default="content", help="content directory to measure")
+    args = parser.parse_args()
+
+    html_slotted = bytes_per_instance(lambda: LeafNode("b", "x"))
+    html_dict = bytes_per_instance(lambda: _DictHTMLNode("b", "x"))
+    text_slotted = bytes_per_instance(lambda: TextNode("x", TextType.TEXT))
+    text_dict = bytes_per_instance(lambda: _DictTextNode("x", TextType.TEXT))
+    print(f"HTMLNode: {html_slotted:.0f} B slotted vs {html_dict:.0f} B with __dict__")
+    print(f"TextNode: {text_slotted:.0f} B slotted vs {text_dict:.0f} B with __dict__")
+    print()
+
+    header = f"{'page':<40} {'nodes':>7} {'retained':>10} {'peak':>10} {'saved':>10}"
+    print(header)
+    print("-" * len(header))
+    total_nodes = total_saved = 0
+    pages = collect_pages(args.content, "")
+    for from_path, _ in pages:
+        result = measure_page(from_path)
+        nodes = result["parents"] + result["leaves"]
+        # Every inline leaf was produced from one TextNode as well
+        saved = nodes * (html_dict - html_slotted) + result["leaves"] * (text_dict - text_slotted)
+        total_nodes += nodes
+        total_saved += saved
+        print(f"{os.path.relpath(from_path, args.content):<40} {nodes:>7} "
+              f"{result['retained']:>10} {result['peak']:>10} {saved:>10.0f}")
+    if pages:
+        print("-" * len(header))
+        print(f"{'average per page':<40} {total_nodes / len(pages):>7.0f} "
+              f"{'':>10} {'':>10} {total_saved / len(pages):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Synthetic content trees shaped like content/blog/*/index.md."""
+import os
+import random
+
+WORDS = (
+    "the of and to in a is that for it as was with be by on not he this are or his from at which "
+    "but have an they you were her she there one all we their can been has more if will would so "
+    "ring fellowship shire mountain river elven dwarf wizard journey shadow tower valley forest"
+).split()
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _inline_paragraph(rng, index):
+    parts = [_sentence(rng) for _ in range(rng.randint(3, 6))]
+    parts.insert(1, f"It was **{rng.choice(WORDS)} {rng.choice(WORDS)}** indeed")
+    parts.insert(2, f"and _{rng.choice(WORDS)}_ with `{rng.choice(WORDS)}()` calls")
+    parts.append(f"See [post {index}](/blog/post-{index:06d}) or ![figure](/images/{rng.choice(WORDS)}.png).")
+    return " ".join(parts)
+
+
+def generate_page(rng, index):
+    """Returns the markdown for one synthetic blog post."""
+    blocks = [
+        f"# Post {index}: {_sentence(rng, 5)[:-1]}",
+        "[< Back Home](/)",
+        f"> {_sentence(rng, 20)}",
+    ]
+    for section in range(rng.randint(2, 4)):
+        blocks.append(f"## Section {section + 1}")
+        blocks.append(_inline_paragraph(rng, index))
+        blocks.append("\n".join(f"- **{rng.choice(WORDS)}**: {_sentence(rng, 8)}" for _ in range(rng.randint(2, 5))))
+        blocks.append("\n".join(f"{i + 1}. {_sentence(rng, 6)}" for i in range(rng.randint(2, 4))))
+        blocks.append(_inline_paragraph(rng, index))
+    blocks.append("```\n" + "\n".join(f'print("{rng.choice(WORDS)}")' for _ in range(4)) + "\n```")
+    return "\n\n".join(blocks) + "\n"
+
+
+def generate_site(root, pages, seed=0):
+    """Writes `pages` synthetic posts under root/content and a template beside it.
+
+    Returns (content_dir, template_path). The same seed always produces the
+    same tree, so runs are comparable.
+    """
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    os.makedirs(content_dir, exist_ok=True)
+    with open(os.path.join(content_dir, "index.md"), 'w') as f:
+        f.write(generate_page(rng, 0))
+    for index in range(1, pages):
+        page_dir = os.path.join(content_dir, "blog", f"post-{index:06d}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), 'w') as f:
+            f.write(generate_page(rng, index))
+    template_path = os.path.join(root, "template.html")
+    with open(template_path, 'w') as f:
+        f.write('<!doctype html>\n<html><head><title>{{ Title }}</title>'
+                '<link href="/index.css" rel="stylesheet" /></head>\n'
+                '<body><article>{{ Content }}</article></body></html>\n')
+    return content_dir, template_path
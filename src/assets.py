@@ -0,0 +1,106 @@
+import logging
+import os
+import shutil
+
+from manifest import hash_file, remove_output
+
+logger = logging.getLogger(__name__)
+
+
+def copy_file(source_path, dest_path, link=False):
+    """Copies a file with its timestamps, as cheaply as the filesystem allows.
+
+    With link=True a hardlink is tried first. Otherwise os.copy_file_range
+    lets the kernel copy (or reflink) the data without it passing through
+    Python, falling back to shutil. The file is written beside the
+    destination and moved into place, so a hardlinked destination never
+    has its source modified through it.
+    """
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = dest_path + ".tmp"
+    if link:
+        try:
+            os.link(source_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+            return
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    try:
+        _copy_data(source_path, tmp_path)
+        shutil.copystat(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _copy_data(source_path, dest_path):
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        if hasattr(os, "copy_file_range"):
+            try:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+        shutil.copyfileobj(src, dst)
+
+
+def _is_current(source_path, dest_path, use_hash):
+    """Compares size and mtime, and optionally the contents when only the mtime differs."""
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    source_stat = os.stat(source_path)
+    if source_stat.st_size != dest_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    if use_hash and hash_file(source_path) == hash_file(dest_path):
+        # Same bytes; adopt the source timestamps so the next check is a stat
+        shutil.copystat(source_path, dest_path)
+        return True
+    return False
+
+
+def sync_tree(source_dir, dest_dir, manifest=None, use_hash=False, link=False):
+    """Copies new and changed files from source_dir into dest_dir.
+
+    Returns (copied, removed) lists of destination paths. Files recorded by
+    the manifest as synced assets that no longer exist in source_dir are
+    removed; other files in dest_dir (such as generated pages) are left
+    alone.
+    """
+    copied = []
+    synced = set()
+    for root, _, files in os.walk(source_dir):
+        for item in sorted(files):
+            source_path = os.path.join(root, item)
+            dest_path = os.path.join(dest_dir, os.path.relpath(source_path, source_dir))
+            synced.add(dest_path)
+            if _is_current(source_path, dest_path, use_hash):
+                continue
+            copy_file(source_path, dest_path, link)
+            copied.append(dest_path)
+            logger.debug("Copied %s to %s", source_path, dest_path)
+
+    removed = []
+    if manifest is not None:
+        for dest_path in sorted(manifest.assets - synced):
+            if remove_output(dest_path, dest_dir):
+                removed.append(dest_path)
+        manifest.assets = synced
+    return copied, removed
@@ -9,22 +9,86 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
-markdown_patterns = {
-    BlockType.HEADING: r"^#{1,6} .*$",
-    BlockType.CODE: r"^```[^`]+```$",
-    BlockType.QUOTE: r"^>.*(?:\n>.*)*$",
-    BlockType.UNORDERED_LIST: r"\A([-*]) .*?$(?:\n\1 .*?$)*\Z",
-    BlockType.ORDERED_LIST: r"\A1\. .*?$(?:\n\d+\. .*?$)*\Z",
-    BlockType.PARAGRAPH: r".*"
-}
+_heading_pattern = re.compile(r"#{1,6} [^\n]*")
+_ordered_item_pattern = re.compile(r"\d+\. ")
+_fence_pattern = re.compile(r"(`{3,})([^`\n]*)")
+
+def opening_fence(text: str):
+    """Returns (fence, info string) if the first line of text opens a code fence, else None.
+
+    An opening fence is three or more backticks followed by an optional
+    info string (such as a language name) that contains no backticks.
+    """
+    match = _fence_pattern.match(text)
+    if match is None or (match.end() < len(text) and text[match.end()] != "\n"):
+        return None
+    return match.group(1), match.group(2).strip()
+
+def closes_fence(line: str, fence: str) -> bool:
+    """Checks whether a line is only backticks, at least as many as the opening fence."""
+    line = line.strip()
+    return len(line) >= len(fence) and not line.strip("`")
+
+def _is_code(text: str) -> bool:
+    """A fenced block, or the single-line ```code``` form."""
+    if not text.startswith("```"):
+        return False
+    return opening_fence(text) is not None or len(text) > 6 and text.endswith("```") and "\n" not in text
+
+def code_block_parts(text: str):
+    """Returns (info string, code) for a CODE block; the code ends with one newline.
+
+    The code is everything between the opening fence line and a closing
+    fence line, found with two scans from either end rather than by
+    splitting the listing into lines. An unclosed fence runs to the end of
+    the block.
+    """
+    fence = opening_fence(text)
+    if fence is None:
+        return "", text[3:-3].strip("\n") + "\n"
+    first_end = text.find("\n")
+    if first_end == -1:
+        return fence[1], "\n"
+    last_start = text.rfind("\n") + 1
+    code_end = len(text)
+    if last_start > first_end and closes_fence(text[last_start:], fence[0]):
+        code_end = last_start - 1
+    return fence[1], text[first_end + 1:code_end].strip("\n") + "\n"
+
+def _all_lines_start_with(text: str, prefix: str) -> bool:
+    """Checks every line's prefix with two C-level counts instead of splitting."""
+    return text.startswith(prefix) and text.count("\n") == text.count("\n" + prefix)
+
+def _is_ordered_list(text: str) -> bool:
+    lines = text.split("\n")
+    if not lines[0].startswith("1. "):
+        return False
+    return all(_ordered_item_pattern.match(line) for line in lines[1:])
 
 def block_to_block_type(markdown_text:str) -> BlockType:
-    """Converts a markdown text block to a BlockType."""
+    """Converts a markdown text block to a BlockType.
+
+    The first character picks the single candidate type, which is then
+    confirmed by one anchored pattern or a line scan, so classification is
+    linear in the block length.
+    """
     text = markdown_text.strip()
-    markdown_len = len(text)
-    matches = None
-    for block_type, pattern in markdown_patterns.items():
-        matches = re.match(pattern, text, re.MULTILINE)
-        if matches and len(matches.group(0)) == markdown_len:
-            return block_type
-    return BlockType.PARAGRAPH  # Default to paragraph if no other type matches
\ No newline at end of file
+    if not text:
+        return BlockType.PARAGRAPH
+    first = text[0]
+    if first == "#":
+        if _heading_pattern.fullmatch(text):
+            return BlockType.HEADING
+    elif first == "`":
+        if _is_code(text):
+            return BlockType.CODE
+    elif first == ">":
+        if _all_lines_start_with(text, ">"):
+            return BlockType.QUOTE
+    elif first == "-" or first == "*":
+        if _all_lines_start_with(text, first + " "):
+            return BlockType.UNORDERED_LIST
+    elif first == "1":
+        if _is_ordered_list(text):
+            return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH  # Default to paragraph if no other type matches
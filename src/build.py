@@ -0,0 +1,369 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import profiling
+from frontmatter import load_front_matter
+from manifest import hash_file, hash_files
+from process_markdown import (collect_pages, generate_page, load_page_header, page_metadata, page_template,
+                              parse_source, read_source, render_parsed, streams_source, write_dest, write_page)
+from site_index import page_section, page_url
+from template import load_template
+
+logger = logging.getLogger(__name__)
+
+
+# Template values listing every page of the site, see site_listing
+LISTING_NAMES = ("pages", "sections")
+
+
+class BuildError(Exception):
+    """Raised after a build when one or more pages failed to generate."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to build:"]
+        lines += [f"  {path}: {error}" for path, error in failures]
+        super().__init__("\n".join(lines))
+
+
+def uses_listing(template):
+    """Reports whether a compiled template reads the page listing."""
+    return not template.names.isdisjoint(LISTING_NAMES)
+
+
+def site_listing(dir_path_content, dest_dir_path, basepath="/", drafts=False):
+    """Returns the site-wide template values that list pages.
+
+    `pages` holds one dict per page, sorted by URL, with its front matter
+    plus its title, url and section; `sections` maps each section to its
+    pages. Only the headers of the sources are read. Drafts are left out
+    unless drafts is set, and so are pages whose header cannot be read;
+    the build reports those when it renders them.
+    """
+    pages = []
+    for from_path, dest_path in collect_pages(dir_path_content, dest_dir_path):
+        try:
+            front_matter, title = load_page_header(from_path)
+        except (OSError, ValueError):
+            continue
+        if front_matter.get("draft") and not drafts:
+            continue
+        pages.append(dict(front_matter, title=title, url=page_url(dest_path, dest_dir_path, basepath),
+                          section=page_section(from_path, dir_path_content)))
+    pages.sort(key=lambda page: page["url"])
+    sections = {}
+    for page in pages:
+        sections.setdefault(page["section"], []).append(page)
+    return {"pages": pages, "sections": sections}
+
+
+def listing_hash(site):
+    """Returns a digest of a site_listing, to invalidate pages that render it."""
+    return hashlib.sha256(json.dumps(site["pages"], sort_keys=True).encode()).hexdigest()
+
+
+def page_hash(from_path, site_hash=None):
+    """Returns the hash a page's output is recorded under: its source's, combined with the listing's if used."""
+    source_hash = hash_file(from_path)
+    if site_hash is None:
+        return source_hash
+    return hashlib.sha256((source_hash + site_hash).encode()).hexdigest()
+
+
+def render_options(highlighter=None):
+    """Describes the settings that change page output, for BuildManifest.begin."""
+    return {"highlight": highlighter.name} if highlighter is not None else None
+
+
+_worker_block_cache = None
+_worker_highlighter = None
+_worker_site = None
+
+
+def _init_worker(block_cache, highlighter=None, site=None):
+    """Gives each pool process its own copy of the build's block cache, highlighter and page listing."""
+    global _worker_block_cache, _worker_highlighter, _worker_site
+    _worker_block_cache = block_cache
+    _worker_highlighter = highlighter
+    _worker_site = site
+
+
+def _render_page_safe(args):
+    """Process pool entry point.
+
+    Returns (html, error, stage timings, cache counts, page metadata);
+    timings are only recorded when the parent process is profiling. The
+    cache counts are the (hits, misses) this page added to the block cache
+    and to the highlighter, or None for either one the build does not use.
+    Large sources are streamed into their output here and return no HTML.
+    """
+    from_path, dest_path, template_path, basepath, profile, section = args
+    cache = _worker_block_cache
+    counters = (cache, _worker_highlighter)
+    before = [(counter.hits, counter.misses) if counter else None for counter in counters]
+    profiler = profiling.enable() if profile else None
+    html_content = error = metadata = None
+    try:
+        with profiler.page(from_path) if profiler else contextlib.nullcontext():
+            if streams_source(from_path):
+                metadata = generate_page(from_path, template_path, dest_path, basepath, cache, _worker_highlighter,
+                                         section, _worker_site)
+            else:
+                html_content, metadata = render_parsed(read_source(from_path), template_path, basepath, cache,
+                                                        _worker_highlighter, section, _worker_site)
+    except Exception as e:
+        error = e
+    finally:
+        if profile:
+            profiling.disable()
+    timings = profiler.pages.get(from_path, {}) if profiler else None
+    cache_counts = tuple((counter.hits - start[0], counter.misses - start[1]) if counter else None
+                         for counter, start in zip(counters, before))
+    return html_content, error, timings, cache_counts, metadata
+
+
+def _section(from_path, content_dir):
+    return page_section(from_path, content_dir) if content_dir is not None else ""
+
+
+def _render_pages(pages, template_path, basepath, jobs, block_cache=None, highlighter=None, content_dir=None,
+                  site=None):
+    """Yields _render_page_safe results for each page in order, rendering across `jobs` processes."""
+    profile = profiling.active() is not None
+    work = [(from_path, dest_path, template_path, basepath, profile, _section(from_path, content_dir))
+            for from_path, dest_path in pages]
+    chunksize = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(block_cache, highlighter, site)) as executor:
+        yield from executor.map(_render_page_safe, work, chunksize=chunksize)
+
+
+def _read_timed(from_path):
+    start = time.perf_counter()
+    with open(from_path, 'r') as f:
+        source_text = f.read()
+    return source_text, time.perf_counter() - start
+
+
+def _write_timed(dest_path, html_content):
+    start = time.perf_counter()
+    write_dest(dest_path, html_content)
+    return time.perf_counter() - start
+
+
+def _read_ahead(readers, from_path):
+    """Starts reading a source on a reader thread; returns None for one generate_page streams."""
+    try:
+        if streams_source(from_path):
+            return None
+    except OSError:
+        pass  # the read reports it
+    return readers.submit(_read_timed, from_path)
+
+
+def _finish_write(entry, profiler):
+    from_path, html_content, error, metadata, future = entry
+    if future is not None:
+        try:
+            seconds = future.result()
+        except Exception as e:
+            return None, e, None
+        if profiler is not None:
+            profiler.merge(from_path, {"write": (seconds, 1)})
+    return html_content, error, metadata
+
+
+def _pipeline_pages(pages, template_path, basepath, io_threads, block_cache=None, depth=None, highlighter=None,
+                    content_dir=None, site=None):
+    """Yields (html, error, metadata) for each page in order, once its output has been written.
+
+    Sources are read ahead and outputs written on `io_threads` threads each
+    while the calling thread renders. At most `depth` sources are read ahead
+    and at most `depth` rendered pages wait for their write, which bounds
+    memory when I/O falls behind rendering or the other way round. I/O
+    timings are measured in the threads and merged into the profiler here.
+    Large sources are not read ahead but streamed by generate_page on the
+    calling thread, and return no HTML.
+    """
+    depth = depth or io_threads * 4
+    profiler = profiling.active()
+    with ThreadPoolExecutor(io_threads) as readers, ThreadPoolExecutor(io_threads) as writers:
+        remaining = iter(pages)
+        reads = deque()
+        for from_path, dest_path in remaining:
+            reads.append((from_path, dest_path, _read_ahead(readers, from_path)))
+            if len(reads) >= depth:
+                break
+        writes = deque()
+        while reads:
+            from_path, dest_path, read = reads.popleft()
+            next_page = next(remaining, None)
+            if next_page is not None:
+                reads.append((*next_page, _read_ahead(readers, next_page[0])))
+
+            html_content = error = metadata = None
+            try:
+                with profiler.page(from_path) if profiler else contextlib.nullcontext():
+                    if read is None:
+                        metadata = generate_page(from_path, template_path, dest_path, basepath, block_cache,
+                                                 highlighter, _section(from_path, content_dir), site)
+                    else:
+                        source_text, seconds = read.result()
+                        if profiler is not None:
+                            profiler.merge(from_path, {"read": (seconds, 1)})
+                        html_content, metadata = render_parsed(parse_source(source_text), template_path, basepath,
+                                                                block_cache, highlighter,
+                                                                _section(from_path, content_dir), site)
+            except Exception as e:
+                error = e
+            write = None
+            if error is None and html_content is not None:
+                write = writers.submit(_write_timed, dest_path, html_content)
+            writes.append((from_path, html_content, error, metadata, write))
+            while len(writes) > depth:
+                yield _finish_write(writes.popleft(), profiler)
+        while writes:
+            yield _finish_write(writes.popleft(), profiler)
+
+
+def _serial_pages(pages, template_path, basepath, block_cache=None, highlighter=None, content_dir=None, site=None,
+                  stream=True):
+    """Yields (html, error, metadata) for each page in order, rendering and writing it on this thread.
+
+    With stream, and for large sources either way, pages are streamed into
+    their files by generate_page and no HTML is returned.
+    """
+    profiler = profiling.active()
+    for from_path, dest_path in pages:
+        html_content = error = metadata = None
+        try:
+            with profiler.page(from_path) if profiler else contextlib.nullcontext():
+                section = _section(from_path, content_dir)
+                if stream or streams_source(from_path):
+                    metadata = generate_page(from_path, template_path, dest_path, basepath, block_cache,
+                                             highlighter, section, site)
+                else:
+                    html_content, metadata = render_parsed(read_source(from_path), template_path, basepath,
+                                                            block_cache, highlighter, section, site)
+                    write_page(dest_path, html_content)
+        except Exception as e:
+            error = e
+        yield html_content, error, metadata
+
+
+def _pool_pages(pages, template_path, basepath, jobs, block_cache=None, highlighter=None, content_dir=None,
+                site=None):
+    """Yields (html, error, metadata) for each page in order, rendered by _render_pages and written here.
+
+    Worker timings and cache counts are merged into this process.
+    """
+    profiler = profiling.active()
+    results = _render_pages(pages, template_path, basepath, jobs, block_cache, highlighter, content_dir, site)
+    for (from_path, dest_path), result in zip(pages, results):
+        html_content, error, timings, cache_counts, metadata = result
+        if profiler is not None:
+            profiler.merge(from_path, timings)
+        for counter, counts in zip((block_cache, highlighter), cache_counts):
+            if counter is not None:
+                counter.hits += counts[0]
+                counter.misses += counts[1]
+        if error is None and html_content is not None:
+            try:
+                with profiler.page(from_path) if profiler else contextlib.nullcontext():
+                    write_page(dest_path, html_content)
+            except Exception as e:
+                error = e
+        yield html_content, error, metadata
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest=None, jobs=1,
+                             block_cache=None, page_cache=None, io_threads=0, highlighter=None, drafts=False):
+    """Generates every page under a content folder, raising a BuildError that lists all failures.
+
+    Pages the manifest holds as fresh are skipped and pages in page_cache
+    restored; the rest are rendered in `jobs` processes, or pipelined with
+    `io_threads` I/O threads, or one by one. Drafts are left out unless
+    drafts is set.
+    """
+    if not os.path.exists(dest_dir_path):
+        os.makedirs(dest_dir_path)
+
+    site = site_hash = None
+    layouts = {}
+    pending = []
+    failures = []
+    skipped = restored = 0
+    for from_path, dest_path in collect_pages(dir_path_content, dest_dir_path):
+        try:
+            front_matter = load_front_matter(from_path)
+        except ValueError:
+            front_matter = {}  # reported when the page is rendered
+        if not drafts and front_matter.get("draft", False):
+            logger.debug("Skipping draft %s", from_path)
+            continue
+        section = page_section(from_path, dir_path_content)
+        # The files of the template the page resolves to, partials included,
+        # are recorded in the manifest and part of its page cache key
+        layout = page_template(template_path, front_matter, section)
+        try:
+            if layout not in layouts:
+                template = load_template(layout, basepath)
+                layouts[layout] = template.files, hash_files(template.files), uses_listing(template)
+        except (OSError, ValueError) as e:
+            failures.append((from_path, e))
+            continue
+        templates, layout_hash, listed = layouts[layout]
+        # Pages whose template lists the site are rebuilt whenever the listing changes
+        if listed and site is None:
+            site = site_listing(dir_path_content, dest_dir_path, basepath, drafts)
+            site_hash = listing_hash(site)
+        source_hash = cache_key = None
+        if manifest is not None or page_cache is not None:
+            source_hash = page_hash(from_path, site_hash if listed else None)
+        if manifest is not None and manifest.is_fresh(from_path, source_hash, dest_path):
+            skipped += 1
+            continue
+        if page_cache is not None:
+            cache_key = page_cache.key(source_hash, layout_hash, basepath, highlighter.name if highlighter else "",
+                                       section)
+            html_content = page_cache.get(cache_key)
+            if html_content is not None:
+                write_page(dest_path, html_content)
+                if manifest is not None:
+                    markdown_text, title, front_matter = read_source(from_path)
+                    manifest.record(from_path, source_hash, dest_path,
+                                    page_metadata(markdown_text, title, front_matter), templates)
+                restored += 1
+                continue
+        pending.append((from_path, dest_path, source_hash, cache_key, templates))
+
+    pages = [(from_path, dest_path) for from_path, dest_path, *_ in pending]
+    if jobs > 1:
+        results = _pool_pages(pages, template_path, basepath, jobs, block_cache, highlighter, dir_path_content, site)
+    elif io_threads > 0:
+        results = _pipeline_pages(pages, template_path, basepath, io_threads, block_cache, highlighter=highlighter,
+                                  content_dir=dir_path_content, site=site)
+    else:
+        results = _serial_pages(pages, template_path, basepath, block_cache, highlighter, dir_path_content, site,
+                                stream=page_cache is None)
+    generated = 0
+    for (from_path, dest_path, source_hash, cache_key, templates), result in zip(pending, results):
+        html_content, error, metadata = result
+        if error is not None:
+            failures.append((from_path, error))
+            continue
+        generated += 1
+        logger.debug("Generated %s from %s using %s", dest_path, from_path, template_path)
+        if page_cache is not None and html_content is not None:
+            page_cache.put(cache_key, html_content)
+        if manifest is not None:
+            manifest.record(from_path, source_hash, dest_path, metadata, templates)
+    logger.info("Generated %d page(s), %d restored from cache, %d unchanged", generated, restored, skipped)
+    if failures:
+        raise BuildError(sorted(failures, key=lambda failure: failure[0]))
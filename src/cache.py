@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from document import Document
+
+# Bump whenever rendered output changes, so persisted cache entries from an
+# older generator are never reused.
+GENERATOR_VERSION = "5"
+
+
+def content_key(*parts):
+    """Returns a sha256 hex key for the given string parts and the generator version."""
+    digest = hashlib.sha256(GENERATOR_VERSION.encode())
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(part.encode())
+    return digest.hexdigest()
+
+
+class CacheStore:
+    """Backend interface for persistent caches: opaque bytes under hex keys."""
+
+    def get(self, key):
+        """Returns the stored bytes, or None if the key is missing."""
+        raise NotImplementedError("Subclasses should implement this method")
+
+    def put(self, key, data):
+        raise NotImplementedError("Subclasses should implement this method")
+
+
+class LocalDirectoryStore(CacheStore):
+    """A content-addressed key/value store laid out as <root>/<key[:2]>/<key>.
+
+    Entries are written to a temporary file and renamed into place, so
+    several processes can share one store. The directory holds nothing but
+    entries, so it can be tarred after a CI run and restored on a fresh
+    runner as-is.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class BlockCache:
+    """Memoizes rendered markdown blocks by content hash.
+
+    A bounded LRU keeps recent block Documents in memory; an optional store
+    persists them across builds as JSON (Document.to_data), so loading a
+    shared or restored store cannot run code. Cached documents are shared
+    between pages and must not be modified.
+    """
+
+    def __init__(self, maxsize=1024, store=None):
+        self.maxsize = maxsize
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def key(self, block, basepath, highlight=""):
+        return content_key("block", basepath, highlight, block)
+
+    def get(self, key):
+        """Returns the cached document for a key, or None."""
+        document = self._entries.get(key)
+        if document is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return document
+        if self.store is not None:
+            data = self.store.get(key)
+            if data is not None:
+                try:
+                    document = Document.from_data(json.loads(data))
+                except ValueError:
+                    document = None  # an entry from an older generator, or a damaged one: render again
+                if document is not None:
+                    self._remember(key, document)
+                    self.hits += 1
+                    return document
+        self.misses += 1
+        return None
+
+    def put(self, key, document):
+        self._remember(key, document)
+        if self.store is not None:
+            self.store.put(key, json.dumps(document.to_data(), ensure_ascii=False).encode())
+
+    def _remember(self, key, document):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = document
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+class PageCache:
+    """Caches complete rendered pages in a CacheStore.
+
+    Keys combine the markdown hash, the hash of the template the page
+    resolves to, basepath, highlighter, content section and generator
+    version, so an entry is only reused when the page would render to the
+    same bytes.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, source_hash, template_hash, basepath, highlight="", section=""):
+        return content_key("page", source_hash, template_hash, basepath, highlight, section)
+
+    def get(self, key):
+        """Returns the cached page HTML, or None."""
+        data = self.store.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data.decode('utf-8')
+
+    def put(self, key, html_content):
+        self.store.put(key, html_content.encode('utf-8'))
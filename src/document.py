@@ -0,0 +1,168 @@
+import sys
+
+from htmlnode import escape_text, format_props
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+OPEN = 0
+TEXT = 1
+CLOSE = 2
+
+
+class Document:
+    """A flat HTML document: a bytearray of opcodes beside a list of values.
+
+    OPEN and CLOSE carry an interned tag name and TEXT carries raw,
+    unescaped text. Attributes live in a sparse dict keyed by the position
+    of their OPEN, since most elements have none. Rendering and conversion
+    are single loops over the arrays, with no per-element objects and no
+    recursion.
+    """
+    __slots__ = ("ops", "values", "props")
+
+    def __init__(self):
+        self.ops = bytearray()
+        self.values = []
+        self.props = {}
+
+    def open(self, tag, props=None):
+        if props:
+            self.props[len(self.values)] = props
+        self.ops.append(OPEN)
+        self.values.append(sys.intern(tag))
+
+    def text(self, value):
+        self.ops.append(TEXT)
+        self.values.append(value)
+
+    def close(self, tag):
+        self.ops.append(CLOSE)
+        self.values.append(sys.intern(tag))
+
+    def element(self, tag, value, props=None):
+        """Appends an element holding only text, like a tagged LeafNode."""
+        self.open(tag, props)
+        if value:
+            self.text(value)
+        self.close(tag)
+
+    def extend(self, other):
+        """Appends a copy of another document's opcodes."""
+        offset = len(self.values)
+        for position, props in other.props.items():
+            self.props[position + offset] = props
+        self.ops += other.ops
+        self.values += other.values
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __iter__(self):
+        """Yields (opcode, value, props) in document order; props is None except on some OPENs."""
+        props = self.props
+        for i, op in enumerate(self.ops):
+            yield op, self.values[i], props.get(i) if op == OPEN else None
+
+    def iter_html(self):
+        props = self.props
+        values = self.values
+        for i, op in enumerate(self.ops):
+            if op == TEXT:
+                yield escape_text(values[i])
+            elif op == OPEN:
+                yield f'<{values[i]}{format_props(props.get(i))}>'
+            else:
+                yield f'</{values[i]}>'
+
+    def to_html(self):
+        return ''.join(self.iter_html())
+
+    def write_html(self, fp):
+        fp.writelines(self.iter_html())
+
+    def append_node(self, node):
+        """Flattens an HTMLNode tree onto the end of the document."""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                self.close(node)
+            elif isinstance(node, ParentNode):
+                if not node.tag:
+                    raise ValueError("Tag must be specified for ParentNode")
+                if not node.children:
+                    raise ValueError("Children must be specified for ParentNode")
+                self.open(node.tag, node.props)
+                stack.append(node.tag)
+                stack.extend(reversed(node.children))
+            elif isinstance(node, LeafNode):
+                if node.tag:
+                    self.element(node.tag, node.value, node.props)
+                elif node.value:
+                    self.text(node.value)
+            else:
+                raise TypeError(f"Cannot flatten {type(node).__name__} into a Document")
+
+    def to_data(self):
+        """Returns the document as plain lists, for storing as JSON: [ops, values, [[position, props], ...]]."""
+        return [list(self.ops), self.values, sorted(self.props.items())]
+
+    @classmethod
+    def from_data(cls, data):
+        """Rebuilds a document from to_data, raising ValueError for anything that is not one."""
+        try:
+            ops, values, props = data
+            document = cls()
+            document.ops = bytearray(ops)
+            document.values = [sys.intern(value) if op != TEXT else value for op, value in zip(ops, values)]
+            document.props = {position: element_props for position, element_props in props}
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Not document data: {e}") from None
+        if len(ops) != len(values) or not all(op in (OPEN, TEXT, CLOSE) for op in ops):
+            raise ValueError("Not document data: bad opcodes")
+        if not all(isinstance(value, str) for value in values):
+            raise ValueError("Not document data: values must be strings")
+        for position, element_props in document.props.items():
+            if not (isinstance(position, int) and 0 <= position < len(ops) and ops[position] == OPEN and
+                    isinstance(element_props, dict) and all(isinstance(v, str) for v in element_props.values())):
+                raise ValueError("Not document data: bad attributes")
+        return document
+
+    @classmethod
+    def from_node(cls, node):
+        document = cls()
+        document.append_node(node)
+        return document
+
+    def to_node(self):
+        """Rebuilds an equivalent HTMLNode tree.
+
+        Elements holding at most one text become LeafNodes and the rest
+        ParentNodes, so the tree renders to the same HTML even where it
+        differs in shape from the one the document was made from. The
+        document must have a single root.
+        """
+        roots = []
+        stack = []
+        children = roots
+        props = self.props
+        values = self.values
+        for i, op in enumerate(self.ops):
+            if op == OPEN:
+                stack.append((values[i], props.get(i), children))
+                children = []
+            elif op == TEXT:
+                children.append(LeafNode(None, values[i]))
+            else:
+                tag, element_props, parent = stack.pop()
+                if not children:
+                    node = LeafNode(tag, "", element_props)
+                elif len(children) == 1 and type(children[0]) is LeafNode and children[0].tag is None:
+                    node = LeafNode(tag, children[0].value, element_props)
+                else:
+                    node = ParentNode(tag, children, element_props)
+                parent.append(node)
+                children = parent
+        if stack or len(roots) != 1:
+            raise ValueError("Document must have exactly one root")
+        return roots[0]
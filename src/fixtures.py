@@ -0,0 +1,27 @@
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """A test case with a scratch folder, self.root, that is removed after each test."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def _write(self, path, text, mtime=None):
+        """Writes a file under self.root (or at an absolute path), creating its folder, and returns its path."""
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def _read(self, *parts):
+        """Returns the text of a file under self.root, or at an absolute path."""
+        with open(os.path.join(self.root, *parts)) as f:
+            return f.read()
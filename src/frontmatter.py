@@ -0,0 +1,128 @@
+import io
+
+# Opening/closing line -> separator between key and value
+DELIMITERS = {"---": ":", "+++": "="}
+
+_TRUE = ("true", "yes", "on")
+_FALSE = ("false", "no", "off")
+
+
+class FrontMatterError(ValueError):
+    """Raised for front matter that cannot be parsed; `line` is 1-based within the file."""
+
+    def __init__(self, message, line):
+        super().__init__(f"{message} (line {line})")
+        self.message = message
+        self.line = line
+
+
+def _scalar(text):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text.lower() in _TRUE:
+        return True
+    if text.lower() in _FALSE:
+        return False
+    return text
+
+
+def _value(text):
+    """Parses a value: a quoted or bare scalar, or a [flow, list] of them."""
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [_scalar(item) for item in text[1:-1].split(",") if item.strip()]
+    return _scalar(text)
+
+
+def _normalize(front_matter, line):
+    """Checks the types of the keys the generator uses; other keys are kept as parsed."""
+    tags = front_matter.get("tags")
+    if isinstance(tags, str):
+        front_matter["tags"] = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    elif tags is not None and not isinstance(tags, list):
+        raise FrontMatterError("tags must be a list", line)
+    for key in ("title", "date", "template"):
+        if key in front_matter and not isinstance(front_matter[key], str):
+            raise FrontMatterError(f"{key} must be a string", line)
+    if not isinstance(front_matter.get("draft", False), bool):
+        raise FrontMatterError("draft must be true or false", line)
+    return front_matter
+
+
+def read_front_matter(f):
+    """Reads front matter from the start of a text file object.
+
+    Returns (front matter dict, number of lines it took) and leaves the file
+    positioned at the first line of the body. A file that does not start
+    with a --- (YAML-style `key: value`) or +++ (TOML-style `key = value`)
+    line has no front matter: it is rewound and ({}, 0) returned. Values
+    are strings, booleans or [lists]; in the YAML style a key with no value
+    can be followed by `- item` lines.
+    """
+    start = f.tell()
+    delimiter = f.readline().rstrip("\r\n")
+    separator = DELIMITERS.get(delimiter)
+    if separator is None:
+        f.seek(start)
+        return {}, 0
+    front_matter = {}
+    last_key = None
+    number = 1
+    for line in iter(f.readline, ""):
+        number += 1
+        line = line.rstrip("\r\n")
+        content = line.strip()
+        if line == delimiter:
+            return _normalize(front_matter, number), number
+        if not content or content.startswith("#"):
+            continue
+        if separator == ":" and content.startswith("- ") and isinstance(front_matter.get(last_key), list):
+            front_matter[last_key].append(_scalar(content[2:]))
+            continue
+        key, found, value = line.partition(separator)
+        key = key.strip()
+        if not found or not key:
+            pair = "key: value" if separator == ":" else "key = value"
+            raise FrontMatterError(f"Expected '{pair}' in front matter", number)
+        value = value.strip()
+        # A YAML key with nothing after it starts a block list
+        front_matter[key] = _value(value) if value or separator == "=" else []
+        last_key = key
+    raise FrontMatterError("Unclosed front matter", 1)
+
+
+def split_front_matter(text):
+    """Returns (front matter dict, body, number of front matter lines) for a page's full text."""
+    if not text.startswith(tuple(DELIMITERS)):
+        return {}, text, 0
+    f = io.StringIO(text)
+    front_matter, lines = read_front_matter(f)
+    return front_matter, text[f.tell():], lines
+
+
+class _DecodedLines:
+    """The readline/tell/seek subset of a text file over a binary one, decoding line by line."""
+    __slots__ = ("f",)
+
+    def __init__(self, f):
+        self.f = f
+
+    def readline(self):
+        return self.f.readline().decode('utf-8')
+
+    def tell(self):
+        return self.f.tell()
+
+    def seek(self, position):
+        self.f.seek(position)
+
+
+def load_front_matter(path):
+    """Returns a page's front matter, reading and decoding only the header lines of the file.
+
+    Meant for index and listing passes over many pages that do not need
+    their bodies.
+    """
+    with open(path, 'rb') as f:
+        return read_front_matter(_DecodedLines(f))[0]
@@ -0,0 +1,138 @@
+import json
+import re
+
+from cache import content_key
+from leafnode import LeafNode
+
+
+def _lexer(*rules):
+    """Compiles (token kind, pattern) rules into one alternation tried left to right."""
+    return re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in rules), re.MULTILINE)
+
+
+def _keywords(words):
+    return r"\b(?:" + "|".join(words.split()) + r")\b"
+
+
+# Unterminated strings and comments run to the end of the line (or of the
+# code, for multi-line forms) instead of failing, so a lexer never rescans
+# the same text from every quote that fails to close.
+_DOUBLE_QUOTED = r'"(?:[^"\\\n]|\\.)*"?'
+_SINGLE_QUOTED = r"'(?:[^'\\\n]|\\.)*'?"
+_C_COMMENT = r"//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)"
+_NUMBER = r"\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)\b"
+
+_PYTHON = _lexer(
+    ("comment", r"#[^\n]*"),
+    ("string", r"(?<!\w)[rRbBuUfF]{0,2}(?:\"\"\"[\s\S]*?(?:\"\"\"|\Z)|'''[\s\S]*?(?:'''|\Z)|"
+               + _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + ")"),
+    ("number", _NUMBER + "j?"),
+    ("keyword", _keywords("False None True and as assert async await break class continue def del elif else "
+                          "except finally for from global if import in is lambda nonlocal not or pass raise "
+                          "return try while with yield")),
+)
+_JAVASCRIPT = _lexer(
+    ("comment", _C_COMMENT),
+    ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + r"|`(?:[^`\\]|\\[\s\S])*`?"),
+    ("number", _NUMBER),
+    ("keyword", _keywords("async await break case catch class const continue debugger default delete do else "
+                          "export extends false finally for function if import in instanceof let new null of "
+                          "return static super switch this throw true try typeof undefined var void while "
+                          "with yield")),
+)
+_GO = _lexer(
+    ("comment", _C_COMMENT),
+    ("string", _DOUBLE_QUOTED + "|" + _SINGLE_QUOTED + r"|`[^`]*`?"),
+    ("number", _NUMBER),
+    ("keyword", _keywords("break case chan const continue default defer else fallthrough false for func go goto "
+                          "if import interface map nil package range return select struct switch true type var")),
+)
+_SHELL = _lexer(
+    ("comment", r"(?<![\w$#{])#[^\n]*"),
+    ("string", _DOUBLE_QUOTED + r"|'[^']*'?"),
+    ("variable", r"\$(?:\{[^}\n]*\}?|\w+|[@*#?$!])"),
+    ("keyword", _keywords("case do done elif else esac export fi for function if in local return then until "
+                          "while")),
+)
+_JSON = _lexer(
+    ("string", _DOUBLE_QUOTED),
+    ("number", r"-?" + _NUMBER),
+    ("keyword", _keywords("true false null")),
+)
+
+LEXERS = {
+    "python": _PYTHON,
+    "py": _PYTHON,
+    "javascript": _JAVASCRIPT,
+    "js": _JAVASCRIPT,
+    "go": _GO,
+    "bash": _SHELL,
+    "sh": _SHELL,
+    "shell": _SHELL,
+    "json": _JSON,
+}
+
+
+def tokenize(code, language):
+    """Splits code into (kind, text) tokens, or returns None for an unknown language.
+
+    Text between matches gets the kind "". Every lexer is a single compiled
+    alternation scanned once over the code.
+    """
+    lexer = LEXERS.get(language.lower())
+    if lexer is None:
+        return None
+    tokens = []
+    position = 0
+    for match in lexer.finditer(code):
+        start = match.start()
+        if start > position:
+            tokens.append(("", code[position:start]))
+        tokens.append((match.lastgroup, match.group()))
+        position = match.end()
+    if position < len(code):
+        tokens.append(("", code[position:]))
+    return tokens
+
+
+class Highlighter:
+    """Turns code into <span class="tok-KIND"> nodes, memoizing tokens by (language, code hash).
+
+    Token lists are persisted as JSON in an optional CacheStore, so unchanged
+    snippets are not tokenized again in later builds. Subclasses can plug
+    in another lexer by overriding tokenize() and giving it a new name;
+    the name is part of every cache key.
+    """
+
+    name = "builtin"
+
+    def __init__(self, store=None):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def tokenize(self, code, language):
+        return tokenize(code, language)
+
+    def highlight(self, code, language):
+        """Returns nodes for the highlighted code, or None if the language is not supported."""
+        language = language.lower()
+        key = content_key("highlight", self.name, language, code)
+        data = self.store.get(key) if self.store is not None else None
+        tokens = None
+        if data is not None:
+            try:
+                tokens = json.loads(data)
+            except ValueError:
+                pass  # an entry from an older generator, or a damaged one: tokenize again
+        if tokens is not None:
+            self.hits += 1
+        else:
+            tokens = self.tokenize(code, language)
+            if tokens is None:
+                return None
+            self.misses += 1
+            if self.store is not None:
+                self.store.put(key, json.dumps(tokens, ensure_ascii=False).encode())
+        return [LeafNode("span", text, {"class": f"tok-{kind}"}) if kind else LeafNode(None, text)
+                for kind, text in tokens]
@@ -1,11 +1,13 @@
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_text
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, props=props)
 
     def to_html(self) -> str:
         if not self.tag:
-            return self.value if self.value else ''
+            return escape_text(self.value) if self.value else ''
         attr_str = super().props_to_html()
-        return f'<{self.tag}{attr_str}>{self.value}</{self.tag}>'
\ No newline at end of file
+        return f'<{self.tag}{attr_str}>{escape_text(self.value or "")}</{self.tag}>'
\ No newline at end of file
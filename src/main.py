@@ -1,30 +1,121 @@
-from process_markdown import generate_pages_recursive
+from build import BuildError, generate_pages_recursive, render_options
+from process_markdown import check_pages, format_diagnostic
+from manifest import BuildManifest
+from assets import sync_tree
+from cache import BlockCache, LocalDirectoryStore, PageCache
+from highlight import Highlighter
+from site_index import write_site_index
+from template import TemplateError
+from watch import SiteWatcher, serve
+import profiling
+import argparse
+import logging
 import shutil
 import os
 import sys
 
-def recursive_copy(source_folder, destination_folder):
-    if not os.path.exists(destination_folder):
-        os.makedirs(destination_folder)
+MANIFEST_PATH = ".build-manifest.json"
+PROFILE_PATH = "build-profile.json"
 
-    for item in os.listdir(source_folder):
-        source_path = os.path.join(source_folder, item)
-        destination_path = os.path.join(destination_folder, item)
-        if os.path.isdir(source_path):
-            shutil.copytree(source_path, destination_path, dirs_exist_ok=True)
-        else:
-            shutil.copy2(source_path, destination_path)
+logger = logging.getLogger(__name__)
 
 def main():
-    basepath = "/"
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served from")
+    parser.add_argument("--clean", action="store_true", help="delete the output folder and rebuild every page")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="render pages in N processes (0 uses every core; default 1, or every core with --check)")
+    parser.add_argument("--block-cache-size", type=int, default=1024,
+                        help="rendered markdown blocks to keep in memory (0 disables the in-memory cache)")
+    parser.add_argument("--block-cache-dir", metavar="PATH",
+                        help="also persist rendered blocks in this directory across builds")
+    parser.add_argument("--pipeline", type=int, nargs="?", const=4, default=0, metavar="THREADS",
+                        help="overlap reads and writes with rendering on THREADS I/O threads "
+                             "(default 4; used when building with one job)")
+    parser.add_argument("--page-cache-dir", metavar="PATH",
+                        help="reuse rendered pages from this directory (e.g. restored between CI runs)")
+    parser.add_argument("--highlight", action="store_true",
+                        help="syntax-highlight fenced code blocks that name a supported language")
+    parser.add_argument("--highlight-cache-dir", metavar="PATH", default=".highlight-cache",
+                        help="where highlighted snippets are cached across builds (default .highlight-cache)")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="also write sitemap.xml, rss.xml and search-index.json, with links under this URL")
+    parser.add_argument("--hash-assets", action="store_true",
+                        help="compare static files by content when their mtime changed")
+    parser.add_argument("--link-assets", action="store_true",
+                        help="hardlink static files into the output folder instead of copying")
+    parser.add_argument("--drafts", action="store_true", help="also build pages marked draft in their front matter")
+    parser.add_argument("--check", action="store_true",
+                        help="only validate the content (titles and inline markup) and report every problem; "
+                             "nothing is rendered or written")
+    parser.add_argument("--watch", action="store_true", help="serve the site and rebuild changed pages on save")
+    parser.add_argument("--port", type=int, default=8888, help="port for --watch to serve on")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_PATH, metavar="PATH",
+                        help=f"time every build stage and write a JSON report (default {PROFILE_PATH})")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-v", "--verbose", action="store_true", help="log every generated page")
+    verbosity.add_argument("-q", "--quiet", action="store_true", help="only log warnings and errors")
+    args = parser.parse_args()
+
+    level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+    logging.basicConfig(level=level, format="%(message)s")
+    profiler = profiling.enable() if args.profile else None
+
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs is not None else 0 if args.check else 1
+    jobs = jobs if jobs > 0 else os.cpu_count() or 1
+    if args.check:
+        diagnostics = check_pages("content", jobs, "template.html")
+        for diagnostic in diagnostics:
+            print(format_diagnostic(diagnostic))
+        logger.info("Checked content: %d problem(s)", len(diagnostics))
+        sys.exit(1 if diagnostics else 0)
     dest_folder = "docs"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    if os.path.exists(dest_folder):
-        shutil.rmtree(dest_folder)
-    recursive_copy('static', dest_folder)
-    generate_pages_recursive("content", "template.html", dest_folder, basepath)
+    if args.clean:
+        if os.path.exists(dest_folder):
+            shutil.rmtree(dest_folder)
+        if os.path.exists(MANIFEST_PATH):
+            os.remove(MANIFEST_PATH)
+    store = LocalDirectoryStore(args.block_cache_dir) if args.block_cache_dir else None
+    block_cache = BlockCache(args.block_cache_size, store) if args.block_cache_size > 0 or store else None
+    page_cache = PageCache(LocalDirectoryStore(args.page_cache_dir)) if args.page_cache_dir else None
+    highlighter = Highlighter(LocalDirectoryStore(args.highlight_cache_dir)) if args.highlight else None
+    manifest = BuildManifest.load(MANIFEST_PATH)
+    try:
+        manifest.begin("template.html", basepath, render_options(highlighter))
+        copied, removed = sync_tree('static', dest_folder, manifest, args.hash_assets, args.link_assets)
+        logger.info("Synced static files: %d copied, %d removed", len(copied), len(removed))
+        generate_pages_recursive("content", "template.html", dest_folder, basepath, manifest, jobs, block_cache,
+                                 page_cache, args.pipeline, highlighter, args.drafts)
+        if block_cache is not None:
+            logger.info("Block cache: %d hit(s), %d miss(es)", block_cache.hits, block_cache.misses)
+        if highlighter is not None:
+            logger.info("Highlight cache: %d hit(s), %d miss(es)", highlighter.hits, highlighter.misses)
+        if page_cache is not None:
+            logger.info("Page cache: %d hit(s), %d miss(es)", page_cache.hits, page_cache.misses)
+        for path in manifest.prune(dest_folder):
+            logger.info("Removed stale page %s", path)
+        if args.site_url:
+            written = write_site_index(manifest, "content", dest_folder, basepath, args.site_url)
+            logger.info("Site index: %d file(s) updated", len(written))
+    except (BuildError, TemplateError) as e:
+        message = f"Cannot load template: {e}" if isinstance(e, TemplateError) else str(e)
+        if not args.watch:
+            sys.exit(message)
+        logger.error("%s", message)
+    finally:
+        manifest.save()
+        if profiler is not None:
+            profiling.disable()
+            profiler.write_json(args.profile)
+            print(profiler.format_table())
+            logger.info("Wrote profile to %s", args.profile)
+
+    if args.watch:
+        watcher = SiteWatcher("content", "static", "template.html", dest_folder, basepath, manifest, highlighter,
+                              args.site_url, args.drafts)
+        serve(watcher, args.port)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
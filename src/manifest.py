@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+
+from cache import GENERATOR_VERSION
+from template import template_files
+
+MANIFEST_VERSION = 4
+
+
+def hash_file(path):
+    """Returns the sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_files(paths):
+    """Returns one sha256 hex digest covering the contents of several files, in order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(hash_file(path).encode())
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Records what the previous build produced so unchanged pages can be skipped."""
+
+    def __init__(self, path):
+        self.path = path
+        self.template_hash = None
+        self.generator = None
+        self.basepath = None
+        self.options = {}
+        self.pages = {}
+        self.assets = set()
+        self._seen = set()
+        self._file_hashes = {}
+
+    @classmethod
+    def load(cls, path):
+        """Loads a manifest from disk, or returns an empty one if it is missing or unreadable."""
+        manifest = cls(path)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if data.get("version") != MANIFEST_VERSION:
+            return manifest
+        manifest.template_hash = data.get("template_hash")
+        manifest.generator = data.get("generator")
+        manifest.basepath = data.get("basepath")
+        manifest.options = data.get("options", {})
+        manifest.pages = data.get("pages", {})
+        manifest.assets = set(data.get("assets", []))
+        return manifest
+
+    def begin(self, template_path, basepath, options=None):
+        """Starts a build, invalidating every page if the generator, template, basepath or render options changed.
+
+        The template counts as changed when it, a section layout or one of
+        the partials they include does. options is a JSON-serializable dict
+        of settings that affect page output, such as the syntax highlighter.
+        """
+        options = options or {}
+        template_hash = hash_files(template_files(template_path))
+        if (GENERATOR_VERSION != self.generator or template_hash != self.template_hash or
+                basepath != self.basepath or options != self.options):
+            for entry in self.pages.values():
+                entry["hash"] = None
+        self.template_hash = template_hash
+        self.generator = GENERATOR_VERSION
+        self.basepath = basepath
+        self.options = options
+        self._seen = set()
+        self._file_hashes = {}
+
+    def _file_hash(self, path):
+        """Returns a file's hash, or None if it is gone; hashed once per build."""
+        if path not in self._file_hashes:
+            try:
+                self._file_hashes[path] = hash_file(path)
+            except FileNotFoundError:
+                self._file_hashes[path] = None
+        return self._file_hashes[path]
+
+    def is_fresh(self, source_path, source_hash, dest_path):
+        """Marks a source as seen and reports whether its recorded output is still valid.
+
+        The output is stale when the source or any template file it was
+        rendered with changed.
+        """
+        self._seen.add(source_path)
+        entry = self.pages.get(source_path)
+        return (entry is not None and
+                entry["hash"] == source_hash and
+                entry["output"] == dest_path and
+                all(self._file_hash(path) == digest for path, digest in entry.get("templates", {}).items()) and
+                os.path.exists(dest_path))
+
+    def record(self, source_path, source_hash, dest_path, metadata=None, templates=()):
+        """Records a successfully generated page.
+
+        metadata is the page's page_metadata; it is kept, together with the
+        source mtime, so the site index never has to re-read unchanged pages.
+        templates are the files the page was rendered from (Template.files),
+        recorded with their hashes for is_fresh.
+        """
+        self._seen.add(source_path)
+        previous = self.pages.get(source_path)
+        if previous and previous["output"] != dest_path:
+            # Directories above the one both outputs share are not left empty
+            remove_output(previous["output"], os.path.commonpath([previous["output"], dest_path]))
+        entry = {"hash": source_hash, "output": dest_path,
+                 "templates": {path: self._file_hash(path) for path in templates}}
+        if metadata is not None:
+            entry["metadata"] = dict(metadata, mtime=os.path.getmtime(source_path))
+        self.pages[source_path] = entry
+
+    def prune(self, output_dir):
+        """Deletes outputs whose sources were not seen in this build and returns their paths.
+
+        Directories this leaves empty are removed, up to output_dir.
+        """
+        removed = []
+        for source_path in list(self.pages):
+            if source_path in self._seen:
+                continue
+            output = self.pages.pop(source_path)["output"]
+            if remove_output(output, output_dir):
+                removed.append(output)
+        return removed
+
+    def save(self):
+        """Writes the manifest atomically."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "template_hash": self.template_hash,
+            "generator": self.generator,
+            "basepath": self.basepath,
+            "options": self.options,
+            "pages": self.pages,
+            "assets": sorted(self.assets),
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def remove_output(path, root):
+    """Removes a generated file and any directories it leaves empty below root, which is kept."""
+    if not os.path.exists(path):
+        return False
+    os.remove(path)
+    root = os.path.abspath(root)
+    parent = os.path.dirname(os.path.abspath(path))
+    while parent != root and os.path.commonpath([parent, root]) == root:
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+    return True
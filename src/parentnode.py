@@ -1,12 +1,32 @@
 from htmlnode import HTMLNode
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, value=None, children=children, props=props)
 
     def to_html(self) -> str:
-        if not self.tag:
-            raise ValueError("Tag must be specified for ParentNode")
-        if not self.children:
-            raise ValueError("Children must be specified for ParentNode")
-        return f'<{self.tag}{super().props_to_html()}>' + ''.join(child.to_html() for child in self.children) + f'</{self.tag}>'
\ No newline at end of file
+        return ''.join(self.iter_html())
+
+    def iter_html(self):
+        """Yields opening tags, leaf HTML and closing tags in document order.
+
+        The tree is walked with an explicit stack, so nesting depth is not
+        limited by the recursion limit and no subtree string is ever built.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif isinstance(node, ParentNode):
+                if not node.tag:
+                    raise ValueError("Tag must be specified for ParentNode")
+                if not node.children:
+                    raise ValueError("Children must be specified for ParentNode")
+                yield f'<{node.tag}{node.props_to_html()}>'
+                stack.append(f'</{node.tag}>')
+                stack.extend(reversed(node.children))
+            else:
+                yield from node.iter_html()
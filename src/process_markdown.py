@@ -1,9 +1,17 @@
 from textnode import TextNode, TextType, text_node_to_html_node
-from blocknode import BlockType, block_to_block_type
-from parentnode import ParentNode
+from blocknode import BlockType, block_to_block_type, closes_fence, code_block_parts, opening_fence
 from leafnode import LeafNode
+from htmlnode import HTMLNode
+from document import Document
+from frontmatter import FrontMatterError, read_front_matter, split_front_matter
+from site_index import page_section
+from template import Markup, load_template, section_layout
+import profiling
 import re
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     """Splits a list of nodes into sublists based on a delimiter."""
@@ -38,78 +46,194 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
     return new_nodes
 
+_bracket_chars = re.compile(r'[\[\]()]')
+
+def _match_brackets(text):
+    """Pairs up unescaped brackets and parentheses in one left-to-right pass.
+
+    Returns a dict mapping the index of every matched '[' or '(' to the
+    index of its closing partner; each kind keeps its own depth stack.
+    Openers that are never closed are left out, and closers with nothing
+    open are ignored.
+    """
+    pairs = {}
+    brackets = []
+    parens = []
+    for match in _bracket_chars.finditer(text):
+        index = match.start()
+        if index and text[index - 1] == '\\':
+            continue
+        char = text[index]
+        if char == '[':
+            brackets.append(index)
+        elif char == '(':
+            parens.append(index)
+        elif char == ']':
+            if brackets:
+                pairs[brackets.pop()] = index
+        elif parens:
+            pairs[parens.pop()] = index
+    return pairs
+
+class _LinkScanner:
+    """Finds the link or image at a given '[' of one text.
+
+    Brackets are paired once, on first use, and the search for a
+    swallowed image only ever moves forward, so probing every '[' from
+    left to right takes linear time however many links the text holds.
+    """
+    __slots__ = ("text", "pairs", "next_image")
+
+    def __init__(self, text):
+        self.text = text
+        self.pairs = None
+        self.next_image = -1  # index of the first '![' after the last probed '[', or len(text)
+
+    def at(self, start):
+        """Returns (start, end, text_type, label, url) for the span whose '[' is at start, or None.
+
+        Labels may contain balanced brackets and URLs balanced parentheses.
+        An image takes precedence over a link whose label would swallow it,
+        so "[![alt](src)](href)" is only an image.
+        """
+        text = self.text
+        if self.pairs is None:
+            self.pairs = _match_brackets(text)
+        close = self.pairs.get(start)
+        if close is None or text[close + 1:close + 2] != '(':
+            return None
+        url_end = self.pairs.get(close + 1)
+        if url_end is None:
+            return None
+        label, url, end = text[start + 1:close], text[close + 2:url_end], url_end + 1
+        if start and text[start - 1] == '!':
+            return start - 1, end, TextType.IMAGE, label, url
+        if self.next_image <= start:
+            self.next_image = text.find('![', start + 1)
+            if self.next_image == -1:
+                self.next_image = len(text)
+        if self.next_image < end:
+            return None
+        return start, end, TextType.LINK, label, url
+
+def iter_links(text):
+    """Yields (start, end, text_type, label, url) for each link and image in text, left to right."""
+    scanner = _LinkScanner(text)
+    position = 0
+    while True:
+        start = text.find('[', position)
+        if start == -1:
+            return
+        span = scanner.at(start)
+        if span is None:
+            position = start + 1
+            continue
+        yield span
+        position = span[1]
+
 def extract_markdown_images(markdown_text):
-    """Extracts image URLs from markdown text."""
-    image_pattern = r'!\[(.*?)\]\((.*?)\)'
-    matches = re.findall(image_pattern, markdown_text)
-    return [(alt, url) for alt, url in matches]
+    """Extracts (alt text, URL) pairs for the images in markdown text."""
+    return [(label, url) for _, _, text_type, label, url in iter_links(markdown_text)
+            if text_type == TextType.IMAGE]
 
 def extract_markdown_links(markdown_text):
-    """Extracts link URLs from markdown text."""
-    link_pattern = r'(?<!\!)\[(.*?)\]\((.*?)\)'
-    matches = re.findall(link_pattern, markdown_text)
-    return [(alt, url) for alt, url in matches]
+    """Extracts (link text, URL) pairs for the links in markdown text."""
+    return [(label, url) for _, _, text_type, label, url in iter_links(markdown_text)
+            if text_type == TextType.LINK]
 
-def split_nodes_image(old_nodes):
-    """Splits nodes that are images into TextNodes."""
+def _split_nodes_links(old_nodes, text_type):
     new_nodes = []
-
     for node in old_nodes:
-        if isinstance(node, TextNode) and node.text_type == TextType.TEXT:
-            image_links = extract_markdown_images(node.text)
-            text = node.text
-            for alt, url in image_links:
-                text_nodes = text.split(f"![{alt}]({url})", 1)
-                if len(text_nodes) > 0:
-                    if text_nodes[0] != "":
-                        new_nodes.append(TextNode(text_nodes[0], TextType.TEXT))
-                    new_nodes.append(TextNode(alt, TextType.IMAGE, url))
-                    text = text_nodes[1] if len(text_nodes) > 1 else ""
-                    if len(text_nodes) > 1 and text_nodes[1] != "":
-                        text = text_nodes[1]
-            if text != "":
-                new_nodes.append(TextNode(text, TextType.TEXT))
-        else:
+        if not (isinstance(node, TextNode) and node.text_type == TextType.TEXT):
             new_nodes.append(node)
+            continue
+        text = node.text
+        position = 0
+        for start, end, span_type, label, url in iter_links(text):
+            if span_type != text_type:
+                continue
+            if start > position:
+                new_nodes.append(TextNode(text[position:start], TextType.TEXT))
+            new_nodes.append(TextNode(label, text_type, url))
+            position = end
+        if position < len(text):
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
     return new_nodes
 
+def split_nodes_image(old_nodes):
+    """Splits the images out of TEXT nodes into IMAGE nodes."""
+    return _split_nodes_links(old_nodes, TextType.IMAGE)
+
 def split_nodes_link(old_nodes):
-    """Splits nodes that are links into TextNodes."""
-    new_nodes = []
+    """Splits the links out of TEXT nodes into LINK nodes."""
+    return _split_nodes_links(old_nodes, TextType.LINK)
 
-    for node in old_nodes:
-        if isinstance(node, TextNode) and node.text_type == TextType.TEXT:
-            web_links = extract_markdown_links(node.text)
-            text = node.text
-            for alt, url in web_links:
-                text_nodes = text.split(f"[{alt}]({url})", 1)
-                if len(text_nodes) > 0:
-                    if text_nodes[0] != "":
-                        new_nodes.append(TextNode(text_nodes[0], TextType.TEXT))
-                    new_nodes.append(TextNode(alt, TextType.LINK, url))
-                    text = text_nodes[1] if len(text_nodes) > 1 else ""
-                    if len(text_nodes) > 1 and text_nodes[1] != "":
-                        text = text_nodes[1]
-            if text != "":
-                new_nodes.append(TextNode(text, TextType.TEXT))
-        else:
-            new_nodes.append(node)
-    return new_nodes
+INLINE_DELIMITERS = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+_inline_start = re.compile(r'\*\*|[_`\[]|!\[')
+
+def _find_closing_delimiter(text, delimiter, start):
+    """Returns the index of the next delimiter not preceded by a backslash, or -1."""
+    index = text.find(delimiter, start)
+    while index > 0 and text[index - 1] == '\\':
+        index = text.find(delimiter, index + 1)
+    return index
 
 def text_to_textnodes(text: str) -> list[TextNode]:
-    """Converts a string to TextNodes."""
+    """Converts a string to TextNodes in a single left-to-right scan.
+
+    Delimited spans (bold, italic, code) are literal inside; escaped
+    delimiters are kept as plain text with their backslash.
+    """
     new_nodes = []
-    new_nodes = split_nodes_delimiter([TextNode(text, TextType.TEXT)], delimiter="**", text_type=TextType.BOLD)
-    new_nodes = split_nodes_delimiter(new_nodes, delimiter="_", text_type=TextType.ITALIC)
-    new_nodes = split_nodes_delimiter(new_nodes, delimiter="`", text_type=TextType.CODE)
-    new_nodes = split_nodes_image(new_nodes)
-    new_nodes = split_nodes_link(new_nodes)
+    position = 0  # start of the plain text not yet emitted
+    search_from = 0
+    links = None
+    while True:
+        match = _inline_start.search(text, search_from)
+        if match is None:
+            break
+        start = match.start()
+        token = match.group(0)
+        if token in INLINE_DELIMITERS:
+            if start > 0 and text[start - 1] == '\\':
+                search_from = start + 1
+                continue
+            end = _find_closing_delimiter(text, token, start + len(token))
+            if end == -1:
+                raise ValueError("Unmatched delimiter in text node")
+            node = TextNode(text[start + len(token):end], INLINE_DELIMITERS[token])
+            end += len(token)
+        else:
+            if token == '[' and start > 0 and text[start - 1] == '!':
+                search_from = start + 1
+                continue
+            if links is None:
+                links = _LinkScanner(text)
+            span = links.at(start if token == '[' else start + 1)
+            if span is None:
+                search_from = start + 1
+                continue
+            _, end, text_type, label, url = span
+            node = TextNode(label, text_type, url)
+        if start > position:
+            new_nodes.append(TextNode(text[position:start], TextType.TEXT))
+        if node.text or node.url is not None:
+            new_nodes.append(node)
+        position = search_from = end
+    if position < len(text):
+        new_nodes.append(TextNode(text[position:], TextType.TEXT))
     return new_nodes
 
 def markdown_to_blocks(markdown):
     """Converts markdown text to a list of TextNodes."""
     if not markdown:
         return []
+    if '```' in markdown:
+        return [block for _, block in _iter_blocks(markdown.split('\n'))]
 
     # Split by newlines to handle paragraphs
     lines = markdown.split('\n\n')
@@ -121,116 +245,554 @@ def markdown_to_blocks(markdown):
     
     return blocks
 
-def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
-    html_nodes = []
-    for text_node in text_nodes:
-        html_nodes.append(text_node_to_html_node(text_node))
-    return html_nodes
+def _iter_blocks(lines):
+    """Yields (start_line, block) for an iterable of lines, numbering from 1.
 
-def markdown_to_html_node(markdown):
-    """Converts markdown text to a list of HTMLNodes."""
-    blocks = markdown_to_blocks(markdown)
-    block_nodes = []
+    Blocks are separated by empty lines and stripped like
+    markdown_to_blocks strips them. A code fence is recognized when it
+    opens: it ends the block before it and runs, blank lines included, to
+    its closing fence (or the end of the input). Only the current block is
+    held in memory.
+    """
+    block_lines = []
+    start_line = None
+    fence = None
+    for number, line in enumerate(lines, 1):
+        if line.endswith('\n'):
+            line = line[:-1]
+        if fence is not None:
+            block_lines.append(line)
+            if closes_fence(line, fence):
+                yield start_line, '\n'.join(block_lines).strip()
+                block_lines = []
+                start_line = fence = None
+            continue
+        if not line:
+            if start_line is not None:
+                yield start_line, '\n'.join(block_lines).strip()
+            block_lines = []
+            start_line = None
+            continue
+        content = line.lstrip()
+        if content.startswith('```'):
+            opened = opening_fence(content)
+            if opened is not None:
+                if start_line is not None:
+                    yield start_line, '\n'.join(block_lines).strip()
+                block_lines = [line]
+                start_line = number
+                fence = opened[0]
+                continue
+        if start_line is None and content:
+            start_line = number
+        block_lines.append(line)
+    if start_line is not None:
+        yield start_line, '\n'.join(block_lines).strip()
 
-    for block in blocks:
+def stream_blocks(lines):
+    """Yields markdown blocks lazily from an iterable of lines, such as an open file."""
+    for _, block in _iter_blocks(lines):
+        yield block
+
+def text_to_children(text, basepath="/"):
+    with profiling.stage("text_to_children"):
+        text_nodes = text_to_textnodes(text)
+        html_nodes = []
+        for text_node in text_nodes:
+            # Root-relative links and images are served from under the basepath
+            if basepath != "/" and text_node.url and text_node.url.startswith("/"):
+                text_node.url = basepath + text_node.url[1:]
+            html_nodes.append(text_node_to_html_node(text_node))
+        return html_nodes
+
+def _block_layout(block, block_type):
+    """Returns (tag, item tag, inline texts) for a block other than code.
+
+    Lists have an item tag and one text per line; other blocks have no item
+    tag and a single text. Returns None for an unknown block type.
+    """
+    match block_type:
+        case BlockType.PARAGRAPH:
+            # Join lines in paragraph block with spaces
+            return "p", None, [' '.join(line.strip() for line in block.split('\n'))]
+        case BlockType.HEADING:
+            header_level = len(block.strip().split(" ")[0])
+            return f"h{header_level}", None, [block.lstrip('#').strip()]
+        case BlockType.QUOTE:
+            # Remove '>' from the beginning of every line
+            return "blockquote", None, ['\n'.join(line.lstrip('>').strip() for line in block.split('\n'))]
+        case BlockType.ORDERED_LIST:
+            return "ol", "li", [line[3:] for line in block.split("\n")]
+        case BlockType.UNORDERED_LIST:
+            return "ul", "li", [line[2:] for line in block.split("\n")]
+        case _:
+            return None  # Handle unknown block type
+
+def _code_block(block, highlighter):
+    """Returns the <code> props and leaf nodes for a code block."""
+    # Remove the fences, tagging the language if given
+    info, code_content = code_block_parts(block)
+    language = info.split()[0] if info else None
+    props = {"class": f"language-{language}"} if language else None
+    code_nodes = None
+    if highlighter is not None and language:
+        with profiling.stage("highlight"):
+            code_nodes = highlighter.highlight(code_content, language)
+    return props, code_nodes or [LeafNode(None, code_content)]
+
+def block_to_html_node(block, basepath="/", highlighter=None):
+    """Converts a single markdown block to an HTMLNode, or None for an unknown block.
+
+    With a Highlighter, code blocks in a supported language get token spans.
+    """
+    document = _block_document(block, basepath, None, highlighter)
+    return document.to_node() if document is not None else None
+
+def _emit_inline(document, tag, text, basepath, required=True):
+    """Appends an element holding the text_to_children of the inline markdown in text.
+
+    An element that would be empty is left out, or raises like an empty
+    ParentNode when required.
+    """
+    html_nodes = text_to_children(text, basepath)
+    if not html_nodes:
+        if required:
+            raise ValueError("Children must be specified for ParentNode")
+        return
+    document.open(tag)
+    for html_node in html_nodes:
+        document.append_node(html_node)
+    document.close(tag)
+
+def _emit_block(document, block, basepath, highlighter):
+    """Appends a block to a Document; the one place markdown blocks are rendered."""
+    with profiling.stage("block_to_block_type"):
         block_type = block_to_block_type(block)
-        match block_type:
-            case BlockType.PARAGRAPH:
-                # Join lines in paragraph block with spaces
-                paragraph_text = ' '.join(line.strip() for line in block.split('\n'))
-                paragraph_nodes = text_to_children(paragraph_text)
-                paragraph_node = ParentNode("p", paragraph_nodes)
-                block_nodes.append(paragraph_node)
-            case BlockType.HEADING:
-                header_level = len(block.strip().split(" ")[0])
-                header_nodes = text_to_children(block.lstrip('#').strip())
-                header_node = ParentNode(f"h{header_level}", header_nodes)
-                block_nodes.append(header_node)
-            case BlockType.CODE:
-                # Remove triple backticks and wrap in <pre><code>
-                code_content = block
-                if code_content.startswith('```') and code_content.endswith('```'):
-                    code_content = code_content[3:-3].strip('\n')
-                    code_content += '\n'
-                code_node = ParentNode("pre", [ParentNode("code", [LeafNode(None, code_content)])])
-                block_nodes.append(code_node)
-            case BlockType.QUOTE:
-                # Remove '>' from the beginning of every line
-                quote_text = '\n'.join(line.lstrip('>').strip() for line in block.split('\n'))
-                quote_nodes = text_to_children(quote_text)
-                quote_node = ParentNode("blockquote", quote_nodes)
-                block_nodes.append(quote_node)
-            case BlockType.ORDERED_LIST:
-                list_items = []
-                lines = block.split("\n")
-                for line in lines:
-                    html_nodes = text_to_children(line[3:])
-                    if len(html_nodes) > 0:
-                        list_items.append(ParentNode("li", html_nodes))
-                list_node = ParentNode("ol", list_items)
-                block_nodes.append(list_node)
-            case BlockType.UNORDERED_LIST:
-                list_items = []
-                lines = block.split("\n")
-                for line in lines:
-                    html_nodes = text_to_children(line[2:])
-                    if len(html_nodes) > 0:
-                        list_items.append(ParentNode("li", html_nodes))
-                list_node = ParentNode("ul", list_items)
-                block_nodes.append(list_node)
-            case _:
-                pass  # Handle unknown block type
-    html_node = ParentNode("div", block_nodes)
-    return html_node
+    if block_type == BlockType.CODE:
+        props, code_nodes = _code_block(block, highlighter)
+        document.open("pre")
+        document.open("code", props)
+        for code_node in code_nodes:
+            document.append_node(code_node)
+        document.close("code")
+        document.close("pre")
+        return
+    layout = _block_layout(block, block_type)
+    if layout is None:
+        return
+    tag, item_tag, texts = layout
+    if item_tag is None:
+        _emit_inline(document, tag, texts[0], basepath)
+        return
+    start = len(document)
+    document.open(tag)
+    for text in texts:
+        _emit_inline(document, item_tag, text, basepath, required=False)
+    if len(document) == start + 1:
+        raise ValueError("Children must be specified for ParentNode")
+    document.close(tag)
+
+def markdown_to_html_node(markdown, basepath="/", cache=None, highlighter=None):
+    """Converts markdown text to a <div> HTMLNode, by way of markdown_to_document."""
+    return markdown_to_document(markdown, basepath, cache, highlighter).to_node()
+
+def _block_document(block, basepath, cache=None, highlighter=None):
+    """Returns a block rendered into its own Document, or None for an unknown block.
+
+    With a BlockCache, blocks seen before (on this page, another page or,
+    with a persistent store, a previous build) are reused instead of being
+    parsed again.
+    """
+    key = None
+    if cache is not None:
+        key = cache.key(block, basepath, highlighter.name if highlighter else "")
+        document = cache.get(key)
+        if document is not None:
+            return document
+    document = Document()
+    _emit_block(document, block, basepath, highlighter)
+    if not document:
+        return None
+    if cache is not None:
+        cache.put(key, document)
+    return document
+
+class StreamedDocument(HTMLNode):
+    """A <div> of block Documents that are parsed one at a time while it is serialized.
+
+    The children are a one-shot iterable, so the document can be written
+    (or converted to a string) only once.
+    """
+    __slots__ = ()
+
+    def __init__(self, children):
+        super().__init__(tag="div", children=children)
+
+    def to_html(self):
+        return ''.join(self.iter_html())
+
+    def iter_html(self):
+        yield '<div>'
+        empty = True
+        for block_document in self.children:
+            empty = False
+            yield from block_document.iter_html()
+        if empty:
+            raise ValueError("Children must be specified for ParentNode")
+        yield '</div>'
+
+def stream_markdown_to_html_node(lines, basepath="/", cache=None, highlighter=None):
+    """Streaming variant of markdown_to_html_node for an iterable of lines, such as an open file.
+
+    Blocks are read, parsed and serialized one at a time, so peak memory is
+    bounded by the largest block rather than the whole document.
+    """
+    def block_documents():
+        for block in stream_blocks(lines):
+            document = _block_document(block, basepath, cache, highlighter)
+            if document is not None:
+                yield document
+    return StreamedDocument(block_documents())
+
+def markdown_to_document(markdown, basepath="/", cache=None, highlighter=None):
+    """Converts markdown text to a flat Document holding a <div> of its blocks.
+
+    Blocks are emitted straight into the document's arrays, so only leaf
+    nodes for inline text are built, never a tree. With a BlockCache, each
+    block is rendered into a Document of its own, which the cache keeps,
+    and copied into the page's.
+    """
+    with profiling.stage("markdown_to_blocks"):
+        blocks = markdown_to_blocks(markdown)
+    if not blocks:
+        raise ValueError("Children must be specified for ParentNode")
+    document = Document()
+    document.open("div")
+    for block in blocks:
+        if cache is None:
+            _emit_block(document, block, basepath, highlighter)
+        else:
+            block_document = _block_document(block, basepath, cache, highlighter)
+            if block_document is not None:
+                document.extend(block_document)
+    document.close("div")
+    return document
+
+def page_metadata(markdown_text, title, front_matter=None):
+    """Returns the title, first-paragraph summary and word count of a page's body.
+
+    The date and tags from its front matter are included when present.
+    """
+    with profiling.stage("metadata"):
+        summary = _summary(stream_blocks(io.StringIO(markdown_text)))
+        return _metadata(title, summary, len(markdown_text.split()), front_matter)
+
+def _metadata(title, summary, words, front_matter):
+    metadata = {"title": title, "summary": summary, "words": words}
+    for key in ("date", "tags"):
+        if front_matter and key in front_matter:
+            metadata[key] = front_matter[key]
+    return metadata
+
+def _summary(blocks):
+    """Returns the plain text of the first paragraph, cut to about SUMMARY_LENGTH characters.
+
+    Image alt text is left out, and paragraphs holding only links and
+    images, such as navigation, are skipped.
+    """
+    for block in blocks:
+        if block_to_block_type(block) != BlockType.PARAGRAPH:
+            continue
+        text = ' '.join(line.strip() for line in block.split('\n'))
+        text_nodes = [text_node for text_node in text_to_textnodes(text) if text_node.text_type != TextType.IMAGE]
+        if all(text_node.text_type == TextType.LINK or not text_node.text.strip() for text_node in text_nodes):
+            continue
+        text = ''.join(text_node.text for text_node in text_nodes).strip()
+        if len(text) > SUMMARY_LENGTH:
+            text = text[:SUMMARY_LENGTH].rsplit(' ', 1)[0] + '…'
+        return text
+    return ""
+
+class _CountingLines:
+    """Wraps an iterable of lines, counting their words as they are consumed."""
+    __slots__ = ("lines", "words")
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.words = 0
+
+    def __iter__(self):
+        for line in self.lines:
+            self.words += len(line.split())
+            yield line
 
 def extract_title(markdown):
-    """Extracts the title from markdown text."""
-    lines = markdown.split('\n')
+    """Extracts the title from the first line of markdown text that starts with '# '.
+
+    Only that line is sliced out; the text is not split into lines.
+    """
+    if markdown.startswith('# '):
+        start = 0
+    else:
+        start = markdown.find('\n# ') + 1
+        if start == 0:
+            raise ValueError("No title found in markdown text")
+    end = markdown.find('\n', start)
+    return markdown[start + 2:end if end != -1 else len(markdown)].strip()
+
+def _extract_title_lines(lines):
     for line in lines:
         if line.startswith('# '):
             return line[2:].strip()  # Return the title without the '# '
     raise ValueError("No title found in markdown text")  # No title found
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    """Generates a page from markdown text."""
+# Sources above this size (in bytes) are parsed as a stream by generate_page
+STREAMING_THRESHOLD = 16 * 1024 * 1024
+# Longest page summary kept in the build metadata, in characters
+SUMMARY_LENGTH = 200
+
+def parse_source(source_text):
+    """Splits a page's full text into (markdown body, title, front matter).
+
+    The title comes from the front matter, or else from the body's first
+    '# ' heading.
+    """
+    with profiling.stage("extract_title"):
+        front_matter, markdown_text, _ = split_front_matter(source_text)
+        title = front_matter.get("title") or extract_title(markdown_text)
+    return markdown_text, title, front_matter
+
+def read_source(from_path):
+    """Reads a markdown file and returns its (markdown body, title, front matter)."""
+    with profiling.stage("read"):
+        with open(from_path, 'r') as f:
+            source_text = f.read()
+    return parse_source(source_text)
+
+def streams_source(from_path):
+    """Reports whether generate_page streams a source rather than reading it whole (see STREAMING_THRESHOLD)."""
+    return os.path.getsize(from_path) > STREAMING_THRESHOLD
+
+def page_template(template_path, front_matter, section=""):
+    """Returns the template for a page.
+
+    That is the template named in its front matter, relative to the default
+    one, else the layout for its content section (see
+    template.section_layout), else the default template.
+    """
+    name = front_matter.get("template")
+    if name:
+        return os.path.join(os.path.dirname(template_path), name)
+    return section_layout(template_path, section) or template_path
+
+def load_page_header(from_path):
+    """Returns a page's (front matter, title), reading the file only up to its title."""
     with open(from_path, 'r') as f:
-        markdown_text = f.read()
-    
-    title = extract_title(markdown_text)
-    html_node = markdown_to_html_node(markdown_text)
+        front_matter, _ = read_front_matter(f)
+        return front_matter, front_matter.get("title") or _extract_title_lines(f)
 
-    # Load template and replace placeholders
-    with open(template_path, 'r') as f:
-        template = f.read()
-    
-    html_content = template.replace('{{ Title }}', title).replace('{{ Content }}', html_node.to_html())
-    # Replace basepath in links
-    html_content = html_content.replace('href="/', f'href="{basepath}') 
-    html_content = html_content.replace('src="/', f'src="{basepath}')  # Handle image sources as well
+def render_parsed(parsed, template_path, basepath, block_cache, highlighter, section="", site=None):
+    """Renders a parse_source result; returns (page HTML, page_metadata)."""
+    markdown_text, title, front_matter = parsed
+    html_content = render_source(markdown_text, title, page_template(template_path, front_matter, section),
+                                 basepath, block_cache, highlighter, front_matter, section, site)
+    return html_content, page_metadata(markdown_text, title, front_matter)
+
+def _template_values(title, content, front_matter, section, site):
+    """Returns the values a page template is rendered with.
 
+    Title is the page title and Content the page body; `page` is the
+    front matter with the title and section; site holds the site_listing
+    values, if the templates use them. The template escapes every string
+    but the body.
+    """
+    values = dict(site) if site else {}
+    values.update(Title=title, Content=content,
+                  page=dict(front_matter or {}, title=title, section=section))
+    return values
+
+def render_source(markdown_text, title, template_path, basepath="/", block_cache=None, highlighter=None,
+                  front_matter=None, section="", site=None):
+    """Renders markdown that has already been read into a complete HTML page."""
+    html_node = markdown_to_document(markdown_text, basepath, block_cache, highlighter)
+
+    # The template is compiled once per build with the basepath already applied
+    with profiling.stage("to_html"):
+        content = Markup(html_node.to_html())
+    with profiling.stage("template"):
+        template = load_template(template_path, basepath)
+        return template.render(**_template_values(title, content, front_matter, section, site))
+
+def _open_dest(dest_path):
+    """Creates the destination's directory and opens a temporary file beside it."""
     # Ensure destination directory exists
     dest_dir = os.path.dirname(dest_path)
     if dest_dir and not os.path.exists(dest_dir):
         os.makedirs(dest_dir, exist_ok=True)
+    return open(dest_path + ".tmp", 'w')
 
-    # Write to destination path
-    with open(dest_path, 'w') as f:
+def _commit_dest(f, dest_path, ok):
+    """Moves a finished temporary file into place, or discards it after a failure."""
+    f.close()
+    if ok:
+        os.replace(f.name, dest_path)
+    else:
+        os.remove(f.name)
+
+def write_dest(dest_path, html_content):
+    """Writes a rendered page through a temporary file, outside any profiling stage."""
+    f = _open_dest(dest_path)
+    ok = False
+    try:
         f.write(html_content)
+        ok = True
+    finally:
+        _commit_dest(f, dest_path, ok)
+
+def write_page(dest_path, html_content):
+    """Writes a rendered page, creating its directory if needed."""
+    with profiling.stage("write"):
+        write_dest(dest_path, html_content)
+
+def generate_page(from_path, template_path, dest_path, basepath="/", block_cache=None, highlighter=None, section="",
+                  site=None):
+    """Generates a page from markdown text and returns its page_metadata.
+
+    The HTML is streamed into the output file node by node; a page that
+    fails halfway leaves any previous output untouched. Sources larger than
+    STREAMING_THRESHOLD bytes are never read whole: short passes over the
+    file find the title and summary, and a final one parses it block by
+    block while counting words. While profiling, smaller pages are rendered
+    to a string first so serialization, template substitution and writing
+    can be timed separately. section picks the page's layout and site holds
+    the site_listing values for templates that use them.
+    """
+    streamed = streams_source(from_path)
+    if profiling.active() is not None and not streamed:
+        html_content, metadata = render_parsed(read_source(from_path), template_path, basepath, block_cache,
+                                                highlighter, section, site)
+        write_page(dest_path, html_content)
+        return metadata
+
+    source = None
+    try:
+        if streamed:
+            source = open(from_path, 'r')
+            front_matter, _ = read_front_matter(source)
+            body_start = source.tell()
+            title = front_matter.get("title") or _extract_title_lines(source)
+            source.seek(body_start)
+            summary = _summary(stream_blocks(source))
+            source.seek(body_start)
+            lines = _CountingLines(source)
+            html_node = stream_markdown_to_html_node(lines, basepath, block_cache, highlighter)
+        else:
+            markdown_text, title, front_matter = read_source(from_path)
+            html_node = markdown_to_document(markdown_text, basepath, block_cache, highlighter)
+        template = load_template(page_template(template_path, front_matter, section), basepath)
+
+        f = _open_dest(dest_path)
+        ok = False
+        try:
+            template.write(f, **_template_values(title, html_node, front_matter, section, site))
+            ok = True
+        finally:
+            _commit_dest(f, dest_path, ok)
+    finally:
+        if source is not None:
+            source.close()
+    if source is not None:
+        return _metadata(title, summary, lines.words, front_matter)
+    return page_metadata(markdown_text, title, front_matter)
+
+def page_dest_path(from_path, dir_path_content, dest_dir_path):
+    """Maps a markdown file under the content directory to its HTML output path."""
+    rel_dir, item = os.path.split(os.path.relpath(from_path, dir_path_content))
+    return os.path.join(dest_dir_path, rel_dir, item.replace('.md', '.html'))
+
+def collect_pages(dir_path_content, dest_dir_path):
+    """Returns (source, destination) pairs for every markdown file, sorted by source path."""
+    pages = []
+    for root, _, files in os.walk(dir_path_content):
+        for item in files:
+            if item.endswith('.md'):
+                from_path = os.path.join(root, item)
+                pages.append((from_path, page_dest_path(from_path, dir_path_content, dest_dir_path)))
+    pages.sort()
+    return pages
+
+def check_page(from_path, template_path=None, section=""):
+    """Validates a markdown file without rendering it; returns (path, line, message) diagnostics.
+
+    Runs the front matter parsing, title extraction, block splitting,
+    classification and inline tokenization of a build, and the empty-block
+    checks of building its nodes, but reports every problem instead of
+    stopping at the first. Given the default template, the page's template
+    is resolved and compiled too. Problems in a list item are reported on
+    the item's line, others on the first line of their block, counting the
+    front matter lines; a file that cannot be read at all gets a line of
+    None.
+    """
+    diagnostics = []
+    try:
+        with open(from_path, 'r') as f:
+            try:
+                front_matter, header_lines = read_front_matter(f)
+            except FrontMatterError as e:
+                # The body cannot be told apart from a broken header
+                return [(from_path, e.line, e.message)]
+            if template_path is not None:
+                try:
+                    load_template(page_template(template_path, front_matter, section))
+                except (OSError, ValueError) as e:
+                    diagnostics.append((from_path, 1 if front_matter.get("template") else None,
+                                        f"Cannot load template: {e}"))
+            body_start = f.tell()
+            try:
+                if not front_matter.get("title"):
+                    _extract_title_lines(f)
+            except UnicodeDecodeError:
+                raise
+            except ValueError as e:
+                diagnostics.append((from_path, header_lines + 1, str(e)))
+            f.seek(body_start)
+            empty = True
+            for start_line, block in _iter_blocks(f):
+                empty = False
+                start_line += header_lines
+                layout = _block_layout(block, block_to_block_type(block))
+                if layout is None:
+                    continue  # code blocks have no inline markup
+                _, item_tag, texts = layout
+                failed = has_content = False
+                for offset, text in enumerate(texts):
+                    try:
+                        has_content = bool(text_to_textnodes(text)) or has_content
+                    except ValueError as e:
+                        failed = True
+                        diagnostics.append((from_path, start_line + offset if item_tag else start_line, str(e)))
+                if not failed and not has_content:
+                    # Rendering needs at least one child node per block
+                    diagnostics.append((from_path, start_line, "Children must be specified for ParentNode"))
+            if empty:
+                diagnostics.append((from_path, header_lines + 1, "Children must be specified for ParentNode"))
+    except (OSError, UnicodeDecodeError) as e:
+        diagnostics.append((from_path, None, str(e)))
+    return diagnostics
+
+def check_pages(dir_path_content, jobs=1, template_path=None):
+    """Checks every markdown file under a folder, across `jobs` processes, and returns all diagnostics."""
+    sources = [from_path for from_path, _ in collect_pages(dir_path_content, "")]
+    sections = [page_section(from_path, dir_path_content) for from_path in sources]
+    if jobs > 1 and len(sources) > 1:
+        chunksize = max(1, len(sources) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(check_page, sources, repeat(template_path), sections, chunksize=chunksize))
+    else:
+        results = map(check_page, sources, repeat(template_path), sections)
+    return [diagnostic for diagnostics in results for diagnostic in diagnostics]
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
-    """Generates pages recursively from markdown files in a directory."""
-    if not os.path.exists(dest_dir_path):
-        os.makedirs(dest_dir_path)
-
-    for item in os.listdir(dir_path_content):
-        item_path = os.path.join(dir_path_content, item)
-        if os.path.isdir(item_path):
-            # Recursively generate pages in subdirectories
-            generate_pages_recursive(item_path, template_path, os.path.join(dest_dir_path, item), basepath)
-        elif item.endswith('.md'):
-            # Generate page for markdown file
-            dest_file_name = item.replace('.md', '.html')
-            dest_file_path = os.path.join(dest_dir_path, dest_file_name)
-            generate_page(item_path, template_path, dest_file_path, basepath)
\ No newline at end of file
+def format_diagnostic(diagnostic):
+    """Formats a diagnostic as path:line: message, the form editors and CI logs link to."""
+    path, line, message = diagnostic
+    return f"{path}: {message}" if line is None else f"{path}:{line}: {message}"
@@ -0,0 +1,140 @@
+import contextlib
+import json
+import statistics
+import time
+
+# Stages in pipeline order, used to order report columns
+STAGES = [
+    "read",
+    "extract_title",
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_children",
+    "highlight",
+    "to_html",
+    "template",
+    "write",
+    "metadata",
+]
+
+_active = None
+_null_stage = contextlib.nullcontext()
+
+
+class _Stage:
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        entry = self.totals.get(self.name)
+        if entry is None:
+            self.totals[self.name] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+
+
+class Profiler:
+    """Collects wall time and call counts per build stage, per page."""
+
+    def __init__(self):
+        self.pages = {}
+        self._current = {}
+
+    @contextlib.contextmanager
+    def page(self, path):
+        """Attributes every stage timed inside the block to the given page."""
+        previous = self._current
+        self._current = self.pages.setdefault(path, {})
+        try:
+            yield
+        finally:
+            self._current = previous
+
+    def stage(self, name):
+        return _Stage(self._current, name)
+
+    def merge(self, path, stages):
+        """Adds stage totals recorded elsewhere, e.g. in a worker process."""
+        totals = self.pages.setdefault(path, {})
+        for name, (seconds, calls) in stages.items():
+            entry = totals.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+
+    def report(self, outliers=10):
+        """Returns per-page and aggregate timings plus the slowest pages."""
+        aggregate = {}
+        page_totals = {}
+        for path, stages in self.pages.items():
+            page_totals[path] = sum(seconds for seconds, _ in stages.values())
+            for name, (seconds, calls) in stages.items():
+                entry = aggregate.setdefault(name, {"seconds": 0.0, "calls": 0})
+                entry["seconds"] += seconds
+                entry["calls"] += calls
+        slowest = sorted(page_totals, key=page_totals.get, reverse=True)[:outliers]
+        return {
+            "pages": {
+                path: {name: {"seconds": seconds, "calls": calls} for name, (seconds, calls) in stages.items()}
+                for path, stages in sorted(self.pages.items())
+            },
+            "aggregate": {name: aggregate[name] for name in _ordered(aggregate)},
+            "total_seconds": sum(page_totals.values()),
+            "median_page_seconds": statistics.median(page_totals.values()) if page_totals else 0.0,
+            "slowest_pages": [{"path": path, "seconds": page_totals[path]} for path in slowest],
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def format_table(self):
+        """Returns the aggregate and slowest-page report as a plain-text table."""
+        report = self.report()
+        total = report["total_seconds"] or 1.0
+        lines = [f"{'stage':<22} {'calls':>9} {'seconds':>10} {'share':>7}"]
+        for name, entry in report["aggregate"].items():
+            lines.append(f"{name:<22} {entry['calls']:>9} {entry['seconds']:>10.4f} "
+                         f"{entry['seconds'] / total:>7.1%}")
+        lines.append(f"{'total':<22} {'':>9} {report['total_seconds']:>10.4f}")
+        lines.append("")
+        lines.append(f"slowest pages (median {report['median_page_seconds'] * 1000:.2f} ms):")
+        for entry in report["slowest_pages"]:
+            lines.append(f"  {entry['seconds'] * 1000:>9.2f} ms  {entry['path']}")
+        return "\n".join(lines)
+
+
+def _ordered(names):
+    known = [name for name in STAGES if name in names]
+    return known + sorted(name for name in names if name not in STAGES)
+
+
+def enable():
+    """Installs and returns a new active profiler."""
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active():
+    """Returns the active profiler, or None when profiling is off."""
+    return _active
+
+
+def stage(name):
+    """Times a block against the active profiler; a shared no-op when profiling is off."""
+    if _active is None:
+        return _null_stage
+    return _active.stage(name)
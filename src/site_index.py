@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "rss.xml"
+SEARCH_INDEX_NAME = "search-index.json"
+# Pages under this content folder are published in the feed
+FEED_SECTION = "blog"
+FEED_ITEMS = 20
+
+
+def page_url(dest_path, dest_dir, basepath):
+    """Returns the URL path a generated page is served at, without index.html."""
+    path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if path == "index.html":
+        path = ""
+    elif path.endswith("/index.html"):
+        path = path[:-len("index.html")]
+    return basepath + path
+
+
+def page_section(source_path, content_dir):
+    """Returns the content section (first folder) a page lives in, or "" for top-level pages."""
+    parts = os.path.relpath(source_path, content_dir).split(os.sep)
+    return parts[0] if len(parts) > 1 else ""
+
+
+def collect_entries(manifest, content_dir, dest_dir, basepath):
+    """Returns one dict per recorded page, sorted by URL, from the metadata kept in the manifest.
+
+    Each entry holds the page's title, summary, word count, mtime and any
+    front matter date and tags, plus its "url" and the content "section"
+    (first folder) it lives in. No source is read, so pages that were
+    skipped as unchanged cost nothing.
+    """
+    entries = []
+    for source_path, page in manifest.pages.items():
+        metadata = page.get("metadata")
+        if metadata is None:
+            continue
+        entries.append(dict(metadata, url=page_url(page["output"], dest_dir, basepath),
+                            section=page_section(source_path, content_dir)))
+    entries.sort(key=lambda entry: entry["url"])
+    return entries
+
+
+def published(entry):
+    """Returns when a page was published: its front matter date as a timestamp, else its mtime.
+
+    Dates without a time zone are taken as UTC.
+    """
+    date = entry.get("date")
+    if date:
+        try:
+            moment = datetime.fromisoformat(date)
+        except ValueError:
+            return entry["mtime"]
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+    return entry["mtime"]
+
+
+def render_sitemap(entries, site_url):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for entry in entries:
+        lastmod = time.strftime("%Y-%m-%d", time.gmtime(entry["mtime"]))
+        lines.append(f'<url><loc>{escape(site_url + entry["url"])}</loc><lastmod>{lastmod}</lastmod></url>')
+    lines.append('</urlset>')
+    return "\n".join(lines) + "\n"
+
+
+def render_feed(entries, site_url, basepath):
+    """Renders an RSS 2.0 feed of the most recently published FEED_ITEMS pages in FEED_SECTION.
+
+    The channel takes its title and description from the home page.
+    """
+    home = next((entry for entry in entries if entry["url"] == basepath), None)
+    title = home["title"] if home else site_url
+    description = home["summary"] if home else ""
+    items = sorted((entry for entry in entries if entry["section"] == FEED_SECTION),
+                   key=lambda entry: (-published(entry), entry["url"]))[:FEED_ITEMS]
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<rss version="2.0">',
+             '<channel>',
+             f'<title>{escape(title)}</title>',
+             f'<link>{escape(site_url + basepath)}</link>',
+             f'<description>{escape(description)}</description>']
+    for entry in items:
+        link = escape(site_url + entry["url"])
+        lines.append(f'<item><title>{escape(entry["title"])}</title><link>{link}</link>'
+                     f'<guid>{link}</guid><pubDate>{formatdate(published(entry), usegmt=True)}</pubDate>'
+                     f'<description>{escape(entry["summary"])}</description></item>')
+    lines += ['</channel>', '</rss>']
+    return "\n".join(lines) + "\n"
+
+
+def render_search_index(entries):
+    """Renders a JSON array of {url, title, summary, words, tags}; URLs are left relative to the host."""
+    index = [{"url": entry["url"], "title": entry["title"], "summary": entry["summary"], "words": entry["words"],
+              "tags": entry.get("tags", [])}
+             for entry in entries]
+    return json.dumps(index, ensure_ascii=False, indent=1) + "\n"
+
+
+def write_site_index(manifest, content_dir, dest_dir, basepath, site_url):
+    """Writes the sitemap, feed and search index for every page in the manifest.
+
+    All three come from one pass over the recorded metadata. A file is only
+    rewritten when its contents change, so rebuilding a few pages leaves
+    the others (and their mtimes) alone. Returns the paths written.
+    """
+    site_url = site_url.rstrip("/")
+    entries = collect_entries(manifest, content_dir, dest_dir, basepath)
+    outputs = {
+        SITEMAP_NAME: render_sitemap(entries, site_url),
+        FEED_NAME: render_feed(entries, site_url, basepath),
+        SEARCH_INDEX_NAME: render_search_index(entries),
+    }
+    written = []
+    for name, text in outputs.items():
+        path = os.path.join(dest_dir, name)
+        if _write_if_changed(path, text):
+            written.append(path)
+            logger.debug("Wrote %s", path)
+    return written
+
+
+def _write_if_changed(path, text):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return True
@@ -0,0 +1,286 @@
+import os
+import re
+
+from htmlnode import escape_text
+
+# {{ expression }} outputs a value and {% statement %} controls the template
+TAG_PATTERN = re.compile(r'\{\{\s*(.*?)\s*\}\}|\{%\s*(.*?)\s*%\}')
+# Per-section layouts live in this folder beside the default template
+LAYOUTS_DIR = "layouts"
+
+_path_pattern = re.compile(r'[A-Za-z_]\w*(?:\.\w+)*')
+_include_pattern = re.compile(r'include\s+(["\'])(.+)\1')
+_for_pattern = re.compile(r'for\s+([A-Za-z_]\w*)\s+in\s+(.+)')
+_filters = {"escape", "safe"}
+
+_template_cache = {}
+
+
+class TemplateError(ValueError):
+    """Raised for a template that cannot be compiled."""
+
+
+class Markup(str):
+    """A string that is already HTML, output by templates as it is."""
+    __slots__ = ()
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+
+MISSING = _Missing()
+
+
+def _lookup(value, key):
+    """Returns value[key] or value.key, or MISSING."""
+    if value is MISSING:
+        return MISSING
+    if isinstance(value, dict):
+        return value.get(key, MISSING)
+    return getattr(value, key, MISSING)
+
+
+def _output(value, raw, safe):
+    """Returns a str or node to emit; missing values are emitted as written."""
+    if value is MISSING:
+        return raw
+    if hasattr(value, "write_html"):
+        return value
+    value = value if isinstance(value, str) else str(value)
+    return value if safe or isinstance(value, Markup) else escape_text(value)
+
+
+def _iterate(value):
+    return () if value is MISSING or value is None else value
+
+
+class Template:
+    """A page template compiled once into a Python function.
+
+    {{ name }} outputs a value passed to render(); names can be dotted
+    (page.title) to look up keys or attributes. Values are escaped unless
+    they are HTMLNodes or Markup strings, which are output as their HTML,
+    or are marked `| safe`; `| escape` is accepted and changes nothing.
+    Unknown names are left as written. {% for item in items %}...{% endfor %}
+    loops, {% if [not] name %}...{% else %}...{% endif %} tests a value and
+    {% include "partial.html" %} inlines another file, relative to this
+    one, at compile time.
+
+    The whole template becomes the body of one generated function that
+    appends constant strings and looked-up values to a list, so rendering
+    costs one call per value rather than a scan of the template text.
+    Root-relative `href="/` and `src="/` attributes in the static text are
+    rewritten to the basepath at compile time.
+    """
+
+    def __init__(self, source, basepath="/", path=None):
+        self.basepath = basepath
+        self.path = path
+        self.slots = []  # top-level names output by {{ }}, in order
+        self.names = set()  # every top-level name the template reads
+        self.files = [path] if path is not None else []
+        self._code = ["def render(ctx, out):", "    append = out.append"]
+        self._text = []
+        self._blocks = []
+        self._scope = []
+        self._including = []
+        self._compile(source, path)
+        if self._blocks:
+            kind, where = self._blocks[-1][:2]
+            raise TemplateError(f"{where}: unclosed {{% {kind} %}}")
+        self._flush()
+        namespace = {"MISSING": MISSING, "_lookup": _lookup, "_output": _output, "_iterate": _iterate}
+        exec(compile("\n".join(self._code), f"<template {path or ''}>", "exec"), namespace)
+        self._render = namespace["render"]
+
+    @staticmethod
+    def _where(path, line):
+        return f"{path or '<template>'}:{line}"
+
+    def _rewrite(self, text):
+        if self.basepath == "/":
+            return text
+        text = text.replace('href="/', f'href="{self.basepath}')
+        return text.replace('src="/', f'src="{self.basepath}')
+
+    def _emit(self, statement):
+        self._flush()
+        self._code.append("    " * (len(self._blocks) + 1) + statement)
+
+    def _flush(self):
+        if self._text:
+            self._code.append("    " * (len(self._blocks) + 1) + f"append({''.join(self._text)!r})")
+            self._text = []
+
+    def _expression(self, text, where):
+        """Compiles a dotted name to Python source; returns (source, filters, first name)."""
+        name, *filters = [part.strip() for part in text.split("|")]
+        if not _path_pattern.fullmatch(name):
+            raise TemplateError(f"{where}: cannot read {text!r}")
+        for name_filter in filters:
+            if name_filter not in _filters:
+                raise TemplateError(f"{where}: unknown filter {name_filter!r}")
+        first, *keys = name.split(".")
+        if first in self._scope:
+            code = f"v_{first}"
+        else:
+            self.names.add(first)
+            code = f"ctx.get({first!r}, MISSING)"
+        for key in keys:
+            code = f"_lookup({code}, {key!r})"
+        return code, filters, first
+
+    def _compile(self, source, path):
+        position = 0
+        line = 1
+        for match in TAG_PATTERN.finditer(source):
+            if match.start() > position:
+                self._text.append(self._rewrite(source[position:match.start()]))
+            line += source.count("\n", position, match.start())
+            position = match.end()
+            where = self._where(path, line)
+            if match.group(1) is not None:
+                code, filters, first = self._expression(match.group(1), where)
+                if first not in self._scope:
+                    self.slots.append(first)
+                self._emit(f"append(_output({code}, {match.group(0)!r}, {'safe' in filters}))")
+            else:
+                self._statement(match.group(2), where, path)
+        if position < len(source):
+            self._text.append(self._rewrite(source[position:]))
+
+    def _statement(self, statement, where, path):
+        keyword = statement.split(None, 1)[0] if statement else ""
+        if keyword == "include":
+            match = _include_pattern.fullmatch(statement)
+            if match is None:
+                raise TemplateError(f"{where}: expected {{% include \"file\" %}}")
+            self._include(match.group(2), where, path)
+        elif keyword == "for":
+            match = _for_pattern.fullmatch(statement)
+            if match is None:
+                raise TemplateError(f"{where}: expected {{% for item in items %}}")
+            code, _, _ = self._expression(match.group(2), where)
+            self._emit(f"for v_{match.group(1)} in _iterate({code}):")
+            self._open("for", where, match.group(1))
+        elif keyword == "if":
+            condition = statement[2:].strip()
+            negate = condition.startswith("not ")
+            code, _, _ = self._expression(condition[4:] if negate else condition, where)
+            self._emit(f"if {'not ' if negate else ''}{code}:")
+            self._open("if", where)
+        elif statement == "else":
+            if not self._blocks or self._blocks[-1][0] != "if":
+                raise TemplateError(f"{where}: {{% else %}} outside {{% if %}}")
+            self._close()
+            self._emit("else:")
+            self._open("else", where)
+        elif statement in ("endfor", "endif"):
+            expected = ("for",) if statement == "endfor" else ("if", "else")
+            if not self._blocks or self._blocks[-1][0] not in expected:
+                raise TemplateError(f"{where}: unexpected {{% {statement} %}}")
+            if self._close() == "for":
+                self._scope.pop()
+        else:
+            raise TemplateError(f"{where}: unknown statement {statement!r}")
+
+    def _open(self, kind, where, loop_name=None):
+        self._blocks.append((kind, where, len(self._code)))
+        if loop_name is not None:
+            self._scope.append(loop_name)
+
+    def _close(self):
+        self._flush()
+        kind, _, start = self._blocks.pop()
+        if len(self._code) == start:
+            self._code.append("    " * (len(self._blocks) + 2) + "pass")
+        return kind
+
+    def _include(self, name, where, path):
+        include_path = os.path.normpath(os.path.join(os.path.dirname(path or ""), name))
+        if include_path in self._including or self.path and include_path == os.path.normpath(self.path):
+            raise TemplateError(f"{where}: {name} includes itself")
+        try:
+            with open(include_path, 'r') as f:
+                source = f.read()
+        except OSError as e:
+            raise TemplateError(f"{where}: cannot include {name}: {e.strerror}") from None
+        if include_path not in self.files:
+            self.files.append(include_path)
+        self._including.append(include_path)
+        self._compile(source, include_path)
+        self._including.pop()
+
+    def render(self, **values):
+        """Renders the template to a string; values are strings, HTMLNodes or any other data."""
+        parts = []
+        self._render(values, parts)
+        return ''.join([part if isinstance(part, str) else part.to_html() for part in parts])
+
+    def write(self, fp, **values):
+        """Streams the rendered page into a file object.
+
+        HTMLNode values are serialized fragment by fragment straight into
+        the file instead of being joined into one string first.
+        """
+        parts = []
+        self._render(values, parts)
+        for part in parts:
+            if isinstance(part, str):
+                fp.write(part)
+            else:
+                part.write_html(fp)
+
+
+def load_template(path, basepath="/"):
+    """Returns the compiled template for a file, recompiling it only when it or a partial changes."""
+    key = (path, basepath)
+    cached = _template_cache.get(key)
+    if cached is not None:
+        try:
+            if all(os.stat(file).st_mtime_ns == mtime for file, mtime in cached[0]):
+                return cached[1]
+        except FileNotFoundError:
+            pass
+    mtime = os.stat(path).st_mtime_ns
+    with open(path, 'r') as f:
+        template = Template(f.read(), basepath, path)
+    mtimes = [(path, mtime)] + [(file, os.stat(file).st_mtime_ns) for file in template.files[1:]]
+    _template_cache[key] = (mtimes, template)
+    return template
+
+
+def section_layout(template_path, section):
+    """Returns the layout for a content section (layouts/<section>.html), or None if there is none."""
+    if not section:
+        return None
+    path = os.path.join(os.path.dirname(template_path), LAYOUTS_DIR, section + ".html")
+    return path if os.path.isfile(path) else None
+
+
+def template_layouts(template_path):
+    """Returns the default template followed by every section layout beside it."""
+    paths = [template_path]
+    layouts_dir = os.path.join(os.path.dirname(template_path), LAYOUTS_DIR)
+    if os.path.isdir(layouts_dir):
+        paths += [os.path.join(layouts_dir, name) for name in sorted(os.listdir(layouts_dir))
+                  if name.endswith(".html")]
+    return paths
+
+
+def template_files(template_path):
+    """Returns every file pages are rendered from: the template, the layouts and the partials they include.
+
+    Templates that pages pick in their front matter from outside the
+    layouts folder are tracked per page by the manifest instead.
+    """
+    files = []
+    for path in template_layouts(template_path):
+        for file in load_template(path).files:
+            if file not in files:
+                files.append(file)
+    return files
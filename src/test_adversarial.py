@@ -0,0 +1,120 @@
+import os
+import sys
+import unittest
+
+from blocknode import block_to_block_type
+from highlight import tokenize
+from process_markdown import (extract_markdown_images, extract_markdown_links, extract_title, markdown_to_blocks,
+                              markdown_to_html_node, split_nodes_delimiter, split_nodes_link, text_to_textnodes)
+from textnode import TextNode, TextType
+
+
+def _render(markdown):
+    return markdown_to_html_node(markdown).to_html()
+
+
+def _split_bold(text):
+    return split_nodes_delimiter([TextNode(text, TextType.TEXT)], "**", TextType.BOLD)
+
+
+def _split_links(text):
+    return split_nodes_link([TextNode(text, TextType.TEXT)])
+
+
+# (name, function, input of about n repetitions) for inputs crafted to
+# trigger backtracking or rescanning. Functions may raise ValueError on
+# malformed input; only the work done to get there matters.
+CORPUS = [
+    ("open brackets", text_to_textnodes, lambda n: "[" * n),
+    ("open image brackets", text_to_textnodes, lambda n: "![" * n),
+    ("unclosed link urls", text_to_textnodes, lambda n: "[a](" * n),
+    ("open parentheses", text_to_textnodes, lambda n: "[a]" + "(" * n),
+    ("nested links", text_to_textnodes, lambda n: "[" * n + "a" + "](b)" * n),
+    ("escaped underscores", text_to_textnodes, lambda n: "\\_" * n + "_"),
+    ("unmatched bold", text_to_textnodes, lambda n: "a **" + "\\**" * n),
+    ("many code spans", text_to_textnodes, lambda n: "`x` " * n),
+    ("split escaped bold", _split_bold, lambda n: "\\**" * n),
+    ("image brackets", extract_markdown_images, lambda n: "![a](" * n),
+    ("link brackets", extract_markdown_links, lambda n: "[a](" * n),
+    ("split dangling labels", _split_links, lambda n: "[a]" * n),
+    ("huge unordered list", _render, lambda n: "- item\n" * n),
+    ("huge ordered list", _render, lambda n: "1. item\n" * n),
+    ("ordered list broken at the end", block_to_block_type, lambda n: "1. item\n" * n + "x"),
+    ("huge quote", _render, lambda n: "> quote\n" * n),
+    ("quote broken at the end", block_to_block_type, lambda n: "> quote\n" * n + "x"),
+    ("long heading", _render, lambda n: "# " + "a" * n),
+    ("unclosed fences", markdown_to_blocks, lambda n: "```\na\n\n" * n),
+    ("fence lines", _render, lambda n: "```\n" * n),
+    ("no title", extract_title, lambda n: "a\n" * n),
+    ("python escaped quotes", lambda code: tokenize(code, "python"), lambda n: "'\\" * n),
+    ("python triple quotes", lambda code: tokenize(code, "python"), lambda n: "'''" + "''" * n),
+    ("javascript comments", lambda code: tokenize(code, "javascript"), lambda n: "/* " * n),
+    ("javascript template strings", lambda code: tokenize(code, "javascript"), lambda n: "`\\" * n),
+    ("shell expansions", lambda code: tokenize(code, "bash"), lambda n: "${" * n),
+    ("json escaped quotes", lambda code: tokenize(code, "json"), lambda n: '"\\' * n),
+]
+
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def count_steps(func, text):
+    """Returns how many lines of the site generator's own modules run for func(text).
+
+    The count is deterministic, unlike a wall-clock time, so it can be
+    compared across sizes without noise. Work done inside the re module's
+    C engine is not counted; bench/adversarial.py times that.
+    """
+    steps = 0
+
+    def trace(frame, event, arg):
+        nonlocal steps
+        if event == "line":
+            steps += 1
+        return trace
+
+    def enter(frame, event, arg):
+        path = frame.f_code.co_filename
+        if os.path.dirname(path) == SOURCE_DIR and not os.path.basename(path).startswith("test_"):
+            return trace
+        return None
+
+    sys.settrace(enter)
+    try:
+        func(text)
+    except ValueError:
+        pass
+    finally:
+        sys.settrace(None)
+    return steps
+
+
+class TestLinearSteps(unittest.TestCase):
+    """Every corpus input must scale linearly: growing it FACTOR times may
+    run at most SLACK * FACTOR times as many lines, while a quadratic path
+    would run FACTOR squared times as many. Timings live in
+    bench/adversarial.py, away from the unit tests.
+    """
+
+    SIZE = 200
+    FACTOR = 4
+    SLACK = 2
+
+    def test_corpus_scales_linearly(self):
+        for name, func, make in CORPUS:
+            with self.subTest(name):
+                small = count_steps(func, make(self.SIZE))
+                large = count_steps(func, make(self.SIZE * self.FACTOR))
+                self.assertLessEqual(large, max(small, 1) * self.FACTOR * self.SLACK,
+                                     f"{name}: {small} -> {large} lines")
+
+    def test_unterminated_strings_run_to_end_of_line(self):
+        self.assertEqual(tokenize("x = 'abc\ny", "python"),
+                         [("", "x = "), ("string", "'abc"), ("", "\ny")])
+
+    def test_unterminated_comment_runs_to_end(self):
+        self.assertEqual(tokenize("a /* b\nc", "javascript"), [("", "a "), ("comment", "/* b\nc")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import unittest
+
+from assets import copy_file, sync_tree
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+
+
+class TestSyncTree(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        self._write(os.path.join(self.static, "index.css"), "body {}")
+        self._write(os.path.join(self.static, "images", "tom.png"), "png-bytes")
+
+    def test_first_sync_copies_everything(self):
+        copied, removed = sync_tree(self.static, self.dest, self.manifest)
+        self.assertEqual(len(copied), 2)
+        self.assertEqual(removed, [])
+        self.assertEqual(self._read(self.dest, "images", "tom.png"), "png-bytes")
+        source = os.stat(os.path.join(self.static, "index.css"))
+        self.assertEqual(os.stat(os.path.join(self.dest, "index.css")).st_mtime_ns, source.st_mtime_ns)
+
+    def test_unchanged_files_are_skipped(self):
+        sync_tree(self.static, self.dest, self.manifest)
+        copied, removed = sync_tree(self.static, self.dest, self.manifest)
+        self.assertEqual((copied, removed), ([], []))
+
+    def test_changed_file_is_copied(self):
+        sync_tree(self.static, self.dest, self.manifest)
+        self._write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        copied, _ = sync_tree(self.static, self.dest, self.manifest)
+        self.assertEqual(copied, [os.path.join(self.dest, "index.css")])
+        self.assertEqual(self._read(self.dest, "index.css"), "body { margin: 0 }")
+
+    def test_hash_mode_skips_touched_but_identical_files(self):
+        sync_tree(self.static, self.dest, self.manifest)
+        path = os.path.join(self.static, "index.css")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 5_000_000_000))
+        copied, _ = sync_tree(self.static, self.dest, self.manifest, use_hash=True)
+        self.assertEqual(copied, [])
+        self.assertEqual(os.stat(os.path.join(self.dest, "index.css")).st_mtime_ns, os.stat(path).st_mtime_ns)
+        copied, _ = sync_tree(self.static, self.dest, self.manifest)
+        self.assertEqual(copied, [])
+
+    def test_orphans_are_removed_but_pages_kept(self):
+        sync_tree(self.static, self.dest, self.manifest)
+        self._write(os.path.join(self.dest, "index.html"), "<p>page</p>")
+        os.remove(os.path.join(self.static, "images", "tom.png"))
+        _, removed = sync_tree(self.static, self.dest, self.manifest)
+        self.assertEqual(removed, [os.path.join(self.dest, "images", "tom.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_assets_persist_in_manifest(self):
+        sync_tree(self.static, self.dest, self.manifest)
+        self.manifest.save()
+        loaded = BuildManifest.load(self.manifest.path)
+        self.assertEqual(loaded.assets, self.manifest.assets)
+
+    def test_link_mode(self):
+        copied, _ = sync_tree(self.static, self.dest, self.manifest, link=True)
+        self.assertEqual(len(copied), 2)
+        source = os.path.join(self.static, "index.css")
+        self.assertTrue(os.path.samefile(source, os.path.join(self.dest, "index.css")))
+
+
+class TestCopyFile(TempDirTestCase):
+    def test_copy_replaces_hardlink_without_touching_source(self):
+        source = self._write("a.txt", "original")
+        other = self._write("b.txt", "replacement")
+        dest = os.path.join(self.root, "out", "a.txt")
+        copy_file(source, dest, link=True)
+        copy_file(other, dest)
+        self.assertEqual(self._read(source), "original")
+        self.assertEqual(self._read(dest), "replacement")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from blocknode import block_to_block_type, BlockType
+from blocknode import block_to_block_type, code_block_parts, BlockType
 
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading(self):
@@ -36,5 +36,42 @@ print('World')
         self.assertEqual(block_to_block_type("Another paragraph\nwith multiple lines."), BlockType.PARAGRAPH)
         self.assertNotEqual(block_to_block_type("- list"), BlockType.PARAGRAPH)
 
+    def test_multiline_heading_is_paragraph(self):
+        self.assertEqual(block_to_block_type("# Heading\nmore text"), BlockType.PARAGRAPH)
+
+    def test_mixed_list_markers(self):
+        self.assertEqual(block_to_block_type("- item 1\n* item 2"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1. First\n- Second"), BlockType.PARAGRAPH)
+
+    def test_quote_with_unquoted_line(self):
+        self.assertEqual(block_to_block_type("> Line 1\nLine 2"), BlockType.PARAGRAPH)
+
+    def test_code_block_with_backtick_inside(self):
+        self.assertEqual(block_to_block_type("```\nuse `x`\n```"), BlockType.CODE)
+
+    def test_code_block_with_info_string(self):
+        self.assertEqual(block_to_block_type("```python\nprint(1)\n```"), BlockType.CODE)
+        self.assertEqual(code_block_parts("```python\nprint(1)\n```"), ("python", "print(1)\n"))
+
+    def test_code_block_parts(self):
+        self.assertEqual(code_block_parts("```\na ``` b\n\n```"), ("", "a ``` b\n"))
+        self.assertEqual(code_block_parts("````\n```\n````"), ("", "```\n"))
+        self.assertEqual(code_block_parts("```js\nunclosed"), ("js", "unclosed\n"))
+        self.assertEqual(code_block_parts("```inline```"), ("", "inline\n"))
+
+    def test_inline_code_ending_in_fence_is_paragraph(self):
+        self.assertEqual(block_to_block_type("`x` then some text ```"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("```inline```"), BlockType.CODE)
+
+    def test_info_string_with_backtick_is_not_a_fence(self):
+        self.assertEqual(block_to_block_type("```a`b\ncode\n```"), BlockType.PARAGRAPH)
+
+    def test_large_blocks(self):
+        items = 50000
+        self.assertEqual(block_to_block_type("\n".join(["- item"] * items)), BlockType.UNORDERED_LIST)
+        self.assertEqual(block_to_block_type("\n".join(["> quoted"] * items)), BlockType.QUOTE)
+        self.assertEqual(block_to_block_type("\n".join(f"{i + 1}. item" for i in range(items))), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type("\n".join(["- item"] * items) + "\nplain"), BlockType.PARAGRAPH)
+
 if __name__ == "__main__":
     unittest.main()
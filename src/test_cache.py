@@ -0,0 +1,174 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+from build import generate_pages_recursive
+from cache import BlockCache, LocalDirectoryStore, PageCache, content_key
+from leafnode import LeafNode
+from process_markdown import markdown_to_html_node
+
+MARKDOWN = """# Title
+
+Shared **footer** with a [link](/about)
+
+- one
+- two
+
+Shared **footer** with a [link](/about)
+"""
+
+
+class TestLocalDirectoryStore(unittest.TestCase):
+    def test_put_and_get(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = LocalDirectoryStore(root)
+            key = content_key("x")
+            self.assertIsNone(store.get(key))
+            store.put(key, b"data")
+            self.assertEqual(store.get(key), b"data")
+            self.assertTrue(os.path.exists(os.path.join(root, key[:2], key)))
+
+    def test_content_key_depends_on_every_part(self):
+        self.assertEqual(content_key("a", "b"), content_key("a", "b"))
+        self.assertNotEqual(content_key("a", "b"), content_key("ab"))
+        self.assertNotEqual(content_key("a", "b"), content_key("a", "c"))
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("k"))
+        cache.put("k", LeafNode("b", "x"))
+        self.assertEqual(cache.get("k").to_html(), "<b>x</b>")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_lru_eviction(self):
+        cache = BlockCache(maxsize=2)
+        for key in ("a", "b"):
+            cache.put(key, LeafNode(None, key))
+        cache.get("a")
+        cache.put("c", LeafNode(None, "c"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_key_includes_basepath(self):
+        cache = BlockCache()
+        self.assertNotEqual(cache.key("[a](/b)", "/"), cache.key("[a](/b)", "/site/"))
+
+    def test_repeated_blocks_render_once(self):
+        cache = BlockCache()
+        html = markdown_to_html_node(MARKDOWN, "/site/", cache).to_html()
+        self.assertEqual(html, markdown_to_html_node(MARKDOWN, "/site/").to_html())
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        markdown_to_html_node(MARKDOWN, "/site/", cache)
+        self.assertEqual((cache.hits, cache.misses), (5, 3))
+
+    def test_store_persists_across_caches(self):
+        with tempfile.TemporaryDirectory() as root:
+            first = BlockCache(store=LocalDirectoryStore(root))
+            expected = markdown_to_html_node(MARKDOWN, "/", first).to_html()
+            second = BlockCache(store=LocalDirectoryStore(root))
+            self.assertEqual(markdown_to_html_node(MARKDOWN, "/", second).to_html(), expected)
+            self.assertEqual(second.misses, 0)
+
+    def test_store_holds_json_and_ignores_unreadable_entries(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = LocalDirectoryStore(root)
+            cache = BlockCache(store=store)
+            markdown_to_html_node(MARKDOWN, "/", cache)
+            key = cache.key("- one\n- two", "/")
+            self.assertEqual(json.loads(store.get(key))[1][:3], ["ul", "li", "one"])
+            for data in (b"\x80not json", b'[[9], ["x"], []]', pickle.dumps(LeafNode(None, "x"))):
+                store.put(key, data)
+                second = BlockCache(store=store)
+                self.assertIsNone(second.get(key))
+                self.assertEqual((second.hits, second.misses), (0, 1))
+
+    def test_parallel_build_counts_worker_hits(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            template = os.path.join(root, "template.html")
+            with open(template, 'w') as f:
+                f.write("{{ Content }}")
+            for name in ("a", "b", "c"):
+                with open(os.path.join(content, f"{name}.md"), 'w') as f:
+                    f.write(MARKDOWN)
+            cache = BlockCache()
+            generate_pages_recursive(content, template, os.path.join(root, "docs"), jobs=2, block_cache=cache)
+            self.assertEqual(cache.hits + cache.misses, 12)
+
+
+class TestPageCache(unittest.TestCase):
+    def _site(self, root):
+        content = os.path.join(root, "content")
+        os.makedirs(content)
+        template = os.path.join(root, "template.html")
+        with open(template, 'w') as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for name in ("a", "b"):
+            with open(os.path.join(content, f"{name}.md"), 'w') as f:
+                f.write(MARKDOWN)
+        return content, template
+
+    def test_key_depends_on_template_and_basepath(self):
+        cache = PageCache(None)
+        key = cache.key("src", "tpl", "/")
+        self.assertNotEqual(key, cache.key("src", "other", "/"))
+        self.assertNotEqual(key, cache.key("src", "tpl", "/site/"))
+        self.assertNotEqual(key, cache.key("src", "tpl", "/", section="blog"))
+
+    def test_restores_pages_without_rendering(self):
+        for jobs in (1, 2):
+            with tempfile.TemporaryDirectory() as root:
+                content, template = self._site(root)
+                store = LocalDirectoryStore(os.path.join(root, "cache"))
+                first = PageCache(store)
+                generate_pages_recursive(content, template, os.path.join(root, "one"), jobs=jobs, page_cache=first)
+                self.assertEqual((first.hits, first.misses), (0, 2))
+
+                second = PageCache(store)
+                generate_pages_recursive(content, template, os.path.join(root, "two"), jobs=jobs, page_cache=second)
+                self.assertEqual((second.hits, second.misses), (2, 0))
+                for name in ("a.html", "b.html"):
+                    with open(os.path.join(root, "one", name)) as f, open(os.path.join(root, "two", name)) as g:
+                        self.assertEqual(f.read(), g.read())
+
+    def test_template_change_misses(self):
+        with tempfile.TemporaryDirectory() as root:
+            content, template = self._site(root)
+            store = LocalDirectoryStore(os.path.join(root, "cache"))
+            generate_pages_recursive(content, template, os.path.join(root, "docs"), page_cache=PageCache(store))
+            with open(template, 'w') as f:
+                f.write("<h1>{{ Title }}</h1>{{ Content }}")
+            cache = PageCache(store)
+            generate_pages_recursive(content, template, os.path.join(root, "docs"), page_cache=cache)
+            self.assertEqual(cache.hits, 0)
+            with open(os.path.join(root, "docs", "a.html")) as f:
+                self.assertTrue(f.read().startswith("<h1>Title</h1>"))
+
+    def test_sections_with_identical_sources_keep_their_layouts(self):
+        with tempfile.TemporaryDirectory() as root:
+            content, template = self._site(root)
+            os.makedirs(os.path.join(content, "blog"))
+            os.makedirs(os.path.join(root, "layouts"))
+            with open(os.path.join(root, "layouts", "blog.html"), 'w') as f:
+                f.write("<main class=\"blog\">{{ Content }}</main>")
+            with open(os.path.join(content, "blog", "a.md"), 'w') as f:
+                f.write(MARKDOWN)
+            store = LocalDirectoryStore(os.path.join(root, "cache"))
+            for _ in range(2):
+                cache = PageCache(store)
+                generate_pages_recursive(content, template, os.path.join(root, "docs"), page_cache=cache)
+            self.assertEqual((cache.hits, cache.misses), (3, 0))
+            with open(os.path.join(root, "docs", "blog", "a.html")) as f:
+                self.assertTrue(f.read().startswith('<main class="blog">'))
+            with open(os.path.join(root, "docs", "a.html")) as f:
+                self.assertTrue(f.read().startswith("<title>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
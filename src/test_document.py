@@ -0,0 +1,117 @@
+import io
+import json
+import unittest
+
+from cache import BlockCache
+from document import CLOSE, OPEN, TEXT, Document
+from leafnode import LeafNode
+from parentnode import ParentNode
+from process_markdown import markdown_to_document, markdown_to_html_node
+
+MARKDOWN = """# Title & more
+
+Some **bold**, _italic_ and `code` with a [link](/about) and ![img](/a.png)
+
+> quoted
+> text
+
+- one
+- two
+
+1. first
+2. second
+
+```py
+x = "<y>"
+```
+"""
+
+
+class TestDocument(unittest.TestCase):
+    def test_opcodes(self):
+        document = Document()
+        document.open("p", {"class": "x"})
+        document.text("a < b")
+        document.close("p")
+        self.assertEqual(list(document), [(OPEN, "p", {"class": "x"}), (TEXT, "a < b", None), (CLOSE, "p", None)])
+        self.assertEqual(document.to_html(), '<p class="x">a &lt; b</p>')
+
+    def test_tags_are_interned(self):
+        document = Document()
+        level = 2
+        document.element(f"h{level}", "a")
+        document.element(f"h{level}", "b")
+        self.assertIs(document.values[0], document.values[3])
+
+    def test_from_node_matches_to_html(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "x "), LeafNode("b", "y"), LeafNode("img", "", {"src": "/i.png"})]),
+            LeafNode("span", "z", {"class": "tok"}),
+        ])
+        self.assertEqual(Document.from_node(node).to_html(), node.to_html())
+
+    def test_from_node_is_not_recursive(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        document = Document.from_node(node)
+        self.assertEqual(len(document), 10001)
+        self.assertEqual(document.to_html(), node.to_html())
+
+    def test_from_node_validates_like_parent_node(self):
+        with self.assertRaises(ValueError):
+            Document.from_node(ParentNode("div", []))
+
+    def test_to_node_round_trip(self):
+        node = markdown_to_html_node(MARKDOWN, "/site/")
+        rebuilt = Document.from_node(node).to_node()
+        self.assertEqual(rebuilt.to_html(), node.to_html())
+
+    def test_to_node_needs_one_root(self):
+        document = Document()
+        document.element("p", "a")
+        document.element("p", "b")
+        with self.assertRaises(ValueError):
+            document.to_node()
+
+    def test_data_round_trip(self):
+        document = markdown_to_document(MARKDOWN, "/site/")
+        rebuilt = Document.from_data(json.loads(json.dumps(document.to_data())))
+        self.assertEqual(rebuilt.to_html(), document.to_html())
+        for data in (None, [[OPEN], [], []], [[OPEN], [1], []], [[TEXT], ["x"], [[0, {"a": "b"}]]]):
+            with self.assertRaises(ValueError):
+                Document.from_data(data)
+
+    def test_write_html(self):
+        document = Document.from_node(ParentNode("p", [LeafNode(None, "x")]))
+        out = io.StringIO()
+        document.write_html(out)
+        self.assertEqual(out.getvalue(), "<p>x</p>")
+
+
+class TestMarkdownToDocument(unittest.TestCase):
+    def test_matches_markdown_to_html_node(self):
+        for basepath in ("/", "/site/"):
+            self.assertEqual(markdown_to_document(MARKDOWN, basepath).to_html(),
+                             markdown_to_html_node(MARKDOWN, basepath).to_html())
+
+    def test_empty_list_items_are_skipped(self):
+        md = "- one\n- \n- three"
+        self.assertEqual(markdown_to_document(md).to_html(), markdown_to_html_node(md).to_html())
+
+    def test_block_cache_holds_documents(self):
+        cache = BlockCache()
+        self.assertEqual(markdown_to_document(MARKDOWN, "/site/", cache).to_html(),
+                         markdown_to_document(MARKDOWN, "/site/").to_html())
+        self.assertIsInstance(cache.get(cache.key("- one\n- two", "/site/")), Document)
+
+    def test_errors_match(self):
+        for md in ("", "**unmatched"):
+            with self.assertRaises(ValueError):
+                markdown_to_html_node(md).to_html()
+            with self.assertRaises(ValueError):
+                markdown_to_document(md).to_html()
+
+
+if __name__ == "__main__":
+    unittest.main()
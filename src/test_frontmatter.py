@@ -0,0 +1,59 @@
+import io
+import os
+import tempfile
+import unittest
+
+from frontmatter import FrontMatterError, load_front_matter, read_front_matter, split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n\nbody"), ({}, "# Title\n\nbody", 0))
+
+    def test_yaml_style(self):
+        text = "---\ntitle: \"Hello: world\"\ndate: 2024-05-01\ndraft: false\ntags: [python, web]\n---\n# H\n"
+        self.assertEqual(split_front_matter(text), (
+            {"title": "Hello: world", "date": "2024-05-01", "draft": False, "tags": ["python", "web"]},
+            "# H\n", 6))
+
+    def test_yaml_block_list_and_comments(self):
+        text = "---\n# a comment\ntags:\n  - one\n  - 'two'\ntemplate: post.html\n\n---\nbody"
+        self.assertEqual(split_front_matter(text)[0], {"tags": ["one", "two"], "template": "post.html"})
+
+    def test_toml_style(self):
+        text = "+++\ntitle = 'Notes'\ndraft = true\ntags = \"a, b\"\n+++\nbody"
+        self.assertEqual(split_front_matter(text), ({"title": "Notes", "draft": True, "tags": ["a", "b"]}, "body", 5))
+
+    def test_horizontal_rule_prefix_is_not_front_matter(self):
+        self.assertEqual(split_front_matter("----\ntext")[0], {})
+
+    def test_errors_carry_the_line(self):
+        with self.assertRaises(FrontMatterError) as raised:
+            split_front_matter("---\ntitle: x\nnot a pair\n---\n")
+        self.assertEqual(raised.exception.line, 3)
+        with self.assertRaises(FrontMatterError) as raised:
+            split_front_matter("---\ndraft: maybe\n---\n")
+        self.assertEqual(raised.exception.message, "draft must be true or false")
+        with self.assertRaises(FrontMatterError) as raised:
+            split_front_matter("---\ntitle: x\n")
+        self.assertEqual(raised.exception.line, 1)
+
+    def test_read_leaves_file_at_body(self):
+        f = io.StringIO("---\ntitle: T\n---\nbody\n")
+        self.assertEqual(read_front_matter(f), ({"title": "T"}, 3))
+        self.assertEqual(f.read(), "body\n")
+        f = io.StringIO("# T\nbody\n")
+        self.assertEqual(read_front_matter(f), ({}, 0))
+        self.assertEqual(f.read(), "# T\nbody\n")
+
+    def test_load_reads_only_the_header(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "page.md")
+            with open(path, 'wb') as f:
+                # A body that is not valid UTF-8 is never decoded
+                f.write(b"---\ntitle: T\n---\n" + b"\xff" * 100000)
+            self.assertEqual(load_front_matter(path), {"title": "T"})
+
+
+if __name__ == "__main__":
+    unittest.main()
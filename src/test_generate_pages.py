@@ -0,0 +1,210 @@
+import os
+import unittest
+from unittest import mock
+
+import build
+import process_markdown
+from cache import LocalDirectoryStore, PageCache
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+from build import BuildError, generate_pages_recursive
+from process_markdown import check_page, check_pages, collect_pages, format_diagnostic
+
+
+class TestGeneratePages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self._write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\n[a](/blog/a)")
+        self._write(os.path.join(self.content, "blog", "a", "index.md"), "# A\n\n**bold**")
+        self._write(os.path.join(self.content, "blog", "b", "index.md"), "# B\n\n- one\n- two")
+
+    def _read_tree(self, dest):
+        pages = {}
+        for root, _, files in os.walk(dest):
+            for item in files:
+                path = os.path.join(root, item)
+                with open(path) as f:
+                    pages[os.path.relpath(path, dest)] = f.read()
+        return pages
+
+    def test_collect_pages_sorted(self):
+        dest = os.path.join(self.root, "docs")
+        pages = collect_pages(self.content, dest)
+        self.assertEqual(pages, [
+            (os.path.join(self.content, "blog", "a", "index.md"), os.path.join(dest, "blog", "a", "index.html")),
+            (os.path.join(self.content, "blog", "b", "index.md"), os.path.join(dest, "blog", "b", "index.html")),
+            (os.path.join(self.content, "index.md"), os.path.join(dest, "index.html")),
+        ])
+
+    def test_parallel_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content, self.template, serial, "/site/")
+        generate_pages_recursive(self.content, self.template, parallel, "/site/", jobs=2)
+        self.assertEqual(self._read_tree(serial), self._read_tree(parallel))
+        self.assertEqual(len(self._read_tree(parallel)), 3)
+
+    def test_pipeline_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+        generate_pages_recursive(self.content, self.template, serial, "/site/")
+        generate_pages_recursive(self.content, self.template, pipelined, "/site/", io_threads=2)
+        self.assertEqual(self._read_tree(serial), self._read_tree(pipelined))
+
+    def test_pipeline_with_more_pages_than_its_queues(self):
+        for i in range(20):
+            self._write(os.path.join(self.content, f"page{i:02}.md"), f"# Page {i}\n\ntext {i}")
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.begin(self.template, "/")
+        generate_pages_recursive(self.content, self.template, serial)
+        generate_pages_recursive(self.content, self.template, pipelined, manifest=manifest, io_threads=1)
+        self.assertEqual(self._read_tree(pipelined), self._read_tree(serial))
+        self.assertEqual(manifest.pages[os.path.join(self.content, "page07.md")]["metadata"]["title"], "Page 7")
+
+    def test_failures_are_aggregated(self):
+        self._write(os.path.join(self.content, "blog", "a", "index.md"), "no title")
+        self._write(os.path.join(self.content, "blog", "b", "index.md"), "# B\n\n**unmatched")
+        self._write(os.path.join(self.content, "tpl.md"), "---\ntemplate: nowhere.html\n---\n# T")
+        dest = os.path.join(self.root, "docs")
+        for options in ({}, {"jobs": 2}, {"io_threads": 2}):
+            with self.assertRaises(BuildError) as context:
+                generate_pages_recursive(self.content, self.template, dest, **options)
+            failed = [path for path, _ in context.exception.failures]
+            self.assertEqual(failed, [
+                os.path.join(self.content, "blog", "a", "index.md"),
+                os.path.join(self.content, "blog", "b", "index.md"),
+                os.path.join(self.content, "tpl.md"),
+            ])
+            self.assertTrue(os.path.exists(os.path.join(dest, "index.html")))
+
+    def test_front_matter_title_template_and_draft(self):
+        self._write(os.path.join(self.root, "post.html"), "<h1>{{ Title }}</h1>{{ Content }}")
+        self._write(os.path.join(self.content, "blog", "a", "index.md"),
+                    "---\ntitle: From front matter\ntemplate: post.html\n---\n# A\n\ntext")
+        self._write(os.path.join(self.content, "blog", "b", "index.md"), "+++\ndraft = true\n+++\n# B")
+        for options in ({}, {"jobs": 2}, {"io_threads": 2}):
+            dest = os.path.join(self.root, "docs")
+            generate_pages_recursive(self.content, self.template, dest, **options)
+            self.assertEqual(self._read_tree(dest)[os.path.join("blog", "a", "index.html")],
+                             "<h1>From front matter</h1><div><h1>A</h1><p>text</p></div>")
+            self.assertNotIn(os.path.join("blog", "b", "index.html"), self._read_tree(dest))
+        generate_pages_recursive(self.content, self.template, dest, drafts=True)
+        self.assertIn(os.path.join("blog", "b", "index.html"), self._read_tree(dest))
+
+    def test_large_sources_stream_in_every_mode(self):
+        serial = os.path.join(self.root, "serial")
+        generate_pages_recursive(self.content, self.template, serial, "/site/")
+        page_cache = PageCache(LocalDirectoryStore(os.path.join(self.root, "pages")))
+        read_whole = mock.Mock(side_effect=AssertionError("source read whole"))
+        with mock.patch.object(process_markdown, "STREAMING_THRESHOLD", 0), \
+                mock.patch.object(process_markdown, "read_source", read_whole), \
+                mock.patch.object(build, "read_source", read_whole), \
+                mock.patch.object(build, "_read_timed", read_whole):
+            for options in ({"jobs": 2}, {"io_threads": 2}, {"page_cache": page_cache}):
+                with self.subTest(options=options):
+                    dest = os.path.join(self.root, "docs")
+                    generate_pages_recursive(self.content, self.template, dest, "/site/", **options)
+                    self.assertEqual(self._read_tree(dest), self._read_tree(serial))
+        read_whole.assert_not_called()
+
+    def test_section_layouts_and_page_listing(self):
+        self._write(os.path.join(self.root, "layouts", "blog.html"),
+                    "<h1>{{ page.section }}: {{ Title }}</h1>{{ Content }}")
+        self._write(self.template,
+                    "{% for post in sections.blog %}<a href=\"{{ post.url }}\">{{ post.title | escape }}</a>"
+                    "{% endfor %}")
+        for options in ({}, {"jobs": 2}, {"io_threads": 2}):
+            dest = os.path.join(self.root, "docs")
+            generate_pages_recursive(self.content, self.template, dest, "/site/", **options)
+            pages = self._read_tree(dest)
+            self.assertEqual(pages["index.html"], '<a href="/site/blog/a/">A</a><a href="/site/blog/b/">B</a>')
+            self.assertEqual(pages[os.path.join("blog", "a", "index.html")],
+                             "<h1>blog: A</h1><div><h1>A</h1><p><b>bold</b></p></div>")
+
+    def test_listing_change_regenerates_unchanged_pages(self):
+        self._write(self.template, "{% for post in pages %}{{ post.title }},{% endfor %}")
+        dest = os.path.join(self.root, "docs")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.begin(self.template, "/")
+        generate_pages_recursive(self.content, self.template, dest, "/", manifest)
+        self.assertEqual(self._read_tree(dest)["index.html"], "Home,A,B,")
+        self._write(os.path.join(self.content, "blog", "b", "index.md"), "---\ntitle: Renamed\n---\n# B")
+        manifest.begin(self.template, "/")
+        generate_pages_recursive(self.content, self.template, dest, "/", manifest)
+        self.assertEqual(self._read_tree(dest)["index.html"], "Home,A,Renamed,")
+
+
+class TestCheckPages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self._write(os.path.join(self.content, "index.md"),
+                    "# Home\n\n[a](/blog/a) and **bold**\n\n```\nunmatched ** in code\n```")
+        self._write(os.path.join(self.content, "blog", "bad.md"),
+                    "No title here\n\n- fine\n- **unclosed\n\n> quote _open\n> more\n\n1. ok\n2. `tick")
+
+    def test_clean_page(self):
+        self.assertEqual(check_page(os.path.join(self.content, "index.md")), [])
+
+    def test_every_problem_is_reported_with_its_line(self):
+        path = os.path.join(self.content, "blog", "bad.md")
+        self.assertEqual([(line, message) for _, line, message in check_page(path)], [
+            (1, "No title found in markdown text"),
+            (4, "Unmatched delimiter in text node"),
+            (6, "Unmatched delimiter in text node"),
+            (10, "Unmatched delimiter in text node"),
+        ])
+
+    def test_check_pages_in_parallel(self):
+        serial = check_pages(self.content)
+        self.assertEqual(len(serial), 4)
+        self.assertEqual(check_pages(self.content, jobs=2), serial)
+        self.assertEqual(format_diagnostic(serial[1]),
+                         os.path.join(self.content, "blog", "bad.md") + ":4: Unmatched delimiter in text node")
+
+    def test_lines_count_the_front_matter(self):
+        self._write(os.path.join(self.content, "front.md"), "---\ntitle: T\n---\nno heading needed\n\n_open")
+        self._write(os.path.join(self.content, "broken.md"), "---\ntitle: T\noops\n---\n")
+        self.assertEqual(check_page(os.path.join(self.content, "front.md")),
+                         [(os.path.join(self.content, "front.md"), 6, "Unmatched delimiter in text node")])
+        self.assertEqual(check_page(os.path.join(self.content, "broken.md")),
+                         [(os.path.join(self.content, "broken.md"), 3,
+                           "Expected 'key: value' in front matter")])
+
+    def test_empty_blocks_fail_like_the_build(self):
+        self._write(os.path.join(self.content, "empty.md"), "# T\n\n>\n\ntext")
+        self._write(os.path.join(self.content, "blank.md"), "---\ntitle: T\n---\n")
+        self.assertEqual(check_page(os.path.join(self.content, "empty.md")),
+                         [(os.path.join(self.content, "empty.md"), 3, "Children must be specified for ParentNode")])
+        self.assertEqual(check_page(os.path.join(self.content, "blank.md")),
+                         [(os.path.join(self.content, "blank.md"), 4, "Children must be specified for ParentNode")])
+        template = self._write("template.html", "{{ Content }}")
+        with self.assertRaisesRegex(BuildError, "Children must be specified"):
+            generate_pages_recursive(self.content, template, os.path.join(self.root, "docs"))
+
+    def test_templates_are_resolved(self):
+        template = self._write("template.html", "{{ Content }}")
+        self._write(os.path.join(self.content, "missing.md"), "---\ntemplate: nowhere.html\n---\n# T\n\ntext")
+        self._write(os.path.join("layouts", "blog.html"), "{% for x in xs %}")
+        self.assertEqual(check_page(os.path.join(self.content, "index.md"), template), [])
+        ((_, line, message),) = check_page(os.path.join(self.content, "missing.md"), template)
+        self.assertEqual(line, 1)
+        self.assertTrue(message.startswith("Cannot load template:"))
+        self.assertIn("blog.html:1: unclosed {% for %}",
+                      check_pages(self.content, 2, template)[0][2])
+
+    def test_unreadable_file(self):
+        with open(os.path.join(self.content, "binary.md"), 'wb') as f:
+            f.write(b"# T\n\xff\xfe")
+        (diagnostic,) = check_page(os.path.join(self.content, "binary.md"))
+        self.assertIsNone(diagnostic[1])
+        self.assertTrue(format_diagnostic(diagnostic).startswith(os.path.join(self.content, "binary.md") + ": "))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+
+from build import generate_pages_recursive
+from cache import LocalDirectoryStore, content_key
+from highlight import Highlighter, tokenize
+from process_markdown import markdown_to_html_node
+
+
+class TestTokenize(unittest.TestCase):
+    def test_python(self):
+        self.assertEqual(tokenize('def f():\n    return "#x"  # done\n', "python"), [
+            ("keyword", "def"), ("", " f():\n    "), ("keyword", "return"), ("", " "),
+            ("string", '"#x"'), ("", "  "), ("comment", "# done"), ("", "\n"),
+        ])
+
+    def test_keywords_need_word_boundaries(self):
+        self.assertEqual(tokenize("define = 10", "py"), [("", "define = "), ("number", "10")])
+
+    def test_tokens_cover_the_code(self):
+        code = 'const s = `a ${b}`; /* c\n */ if (x) { return 0x1f; }\n'
+        self.assertEqual("".join(text for _, text in tokenize(code, "js")), code)
+
+    def test_shell_variables_and_comments(self):
+        self.assertEqual(tokenize('echo "$HOME" ${#a} # hi', "sh"), [
+            ("", "echo "), ("string", '"$HOME"'), ("", " "), ("variable", "${#a}"), ("", " "), ("comment", "# hi"),
+        ])
+
+    def test_language_is_case_insensitive(self):
+        self.assertEqual(tokenize("true", "JSON"), [("keyword", "true")])
+
+    def test_unknown_language(self):
+        self.assertIsNone(tokenize("x", "cobol"))
+
+
+class CountingHighlighter(Highlighter):
+    name = "counting"
+
+    def __init__(self, store=None):
+        super().__init__(store)
+        self.calls = 0
+
+    def tokenize(self, code, language):
+        self.calls += 1
+        return super().tokenize(code, language)
+
+
+class TestHighlighter(unittest.TestCase):
+    def test_code_block_gets_spans(self):
+        html = markdown_to_html_node("```go\nfunc main() {}\n```", highlighter=Highlighter()).to_html()
+        self.assertEqual(html, '<div><pre><code class="language-go"><span class="tok-keyword">func</span>'
+                               ' main() {}\n</code></pre></div>')
+
+    def test_unsupported_language_is_left_plain(self):
+        md = "```cobol\nDISPLAY 'HI'.\n```"
+        self.assertEqual(markdown_to_html_node(md, highlighter=Highlighter()).to_html(),
+                         markdown_to_html_node(md).to_html())
+
+    def test_store_persists_tokens_across_builds(self):
+        with tempfile.TemporaryDirectory() as root:
+            first = CountingHighlighter(LocalDirectoryStore(root))
+            expected = markdown_to_html_node("```py\nx = 1\n```", highlighter=first).to_html()
+            second = CountingHighlighter(LocalDirectoryStore(root))
+            self.assertEqual(markdown_to_html_node("```py\nx = 1\n```", highlighter=second).to_html(), expected)
+            self.assertEqual((first.calls, second.calls), (1, 0))
+            self.assertEqual((second.hits, second.misses), (1, 0))
+
+    def test_store_holds_json_and_ignores_unreadable_entries(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = LocalDirectoryStore(root)
+            key = content_key("highlight", "counting", "py", "x = 1\n")
+            highlighter = CountingHighlighter(store)
+            markdown_to_html_node("```py\nx = 1\n```", highlighter=highlighter)
+            self.assertEqual(json.loads(store.get(key))[0], ["", "x = "])
+            store.put(key, b"\x80not json")
+            markdown_to_html_node("```py\nx = 1\n```", highlighter=highlighter)
+            self.assertEqual((highlighter.calls, highlighter.hits, highlighter.misses), (2, 0, 2))
+
+    def test_worker_counts_are_merged(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            template = os.path.join(root, "template.html")
+            with open(template, 'w') as f:
+                f.write("{{ Content }}")
+            for name in ("a", "b", "c"):
+                with open(os.path.join(content, name + ".md"), 'w') as f:
+                    f.write(f"# {name}\n\n```py\n{name} = 1\n```")
+            highlighter = Highlighter()
+            generate_pages_recursive(content, template, os.path.join(root, "docs"), jobs=2, highlighter=highlighter)
+            self.assertEqual((highlighter.hits, highlighter.misses), (0, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
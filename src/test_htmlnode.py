@@ -1,6 +1,8 @@
 import unittest
 
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, escape_attribute, escape_text
+from leafnode import LeafNode
+from parentnode import ParentNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -65,8 +67,21 @@ class TestHTMLNode(unittest.TestCase):
             "data-value": "test<script>"
         })
         result = node.props_to_html()
-        self.assertIn('title="Hello & Welcome"', result)
-        self.assertIn('data-value="test<script>"', result)
+        self.assertIn('title="Hello &amp; Welcome"', result)
+        self.assertIn('data-value="test&lt;script&gt;"', result)
+
+    def test_props_to_html_escapes_quotes(self):
+        node = HTMLNode(props={"alt": 'say "hi"'})
+        self.assertEqual(node.props_to_html(), ' alt="say &quot;hi&quot;"')
+
+    def test_escape_returns_clean_strings_unchanged(self):
+        text = "nothing to escape here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attribute(text), text)
+
+    def test_escape_ampersand_first(self):
+        self.assertEqual(escape_text("&lt;"), "&amp;lt;")
+        self.assertEqual(escape_attribute('<"&">'), "&lt;&quot;&amp;&quot;&gt;")
 
     def test_to_html_raises_not_implemented(self):
         """Test that to_html raises NotImplementedError"""
@@ -135,6 +150,13 @@ class TestHTMLNode(unittest.TestCase):
         self.assertIsNone(node.children)
         self.assertEqual(node.props, props)
 
+    def test_slots_no_instance_dict(self):
+        """Test HTMLNode and its subclasses store attributes in slots"""
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = 1
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from leafnode import LeafNode
@@ -102,15 +103,30 @@ class TestLeafNode(unittest.TestCase):
     def test_leaf_to_html_special_characters(self):
         """Test LeafNode with special characters in value"""
         node = LeafNode("p", "Hello & goodbye <script>")
-        expected = "<p>Hello & goodbye <script></p>"
+        expected = "<p>Hello &amp; goodbye &lt;script&gt;</p>"
         self.assertEqual(node.to_html(), expected)
 
+    def test_leaf_to_html_quotes_not_escaped_in_text(self):
+        node = LeafNode(None, 'Say "hi"')
+        self.assertEqual(node.to_html(), 'Say "hi"')
+
+    def test_leaf_to_html_escapes_raw_text(self):
+        node = LeafNode(None, "a < b && c")
+        self.assertEqual(node.to_html(), "a &lt; b &amp;&amp; c")
+
     def test_leaf_to_html_empty_string_with_tag(self):
         """Test LeafNode with empty string value and tag"""
         node = LeafNode("p", "")
         expected = "<p></p>"
         self.assertEqual(node.to_html(), expected)
 
+    def test_leaf_to_html_none_value_with_tag(self):
+        node = LeafNode("p", None)
+        self.assertEqual(node.to_html(), "<p></p>")
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<p></p>")
+
 
 if __name__ == "__main__":
     unittest.main()
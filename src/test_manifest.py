@@ -0,0 +1,134 @@
+import os
+import unittest
+
+from unittest import mock
+
+import manifest as manifest_module
+from fixtures import TempDirTestCase
+from manifest import BuildManifest, hash_file
+from highlight import Highlighter
+from build import generate_pages_recursive, render_options
+
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self._write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self._write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nBody")
+
+    def _build(self, basepath="/", highlighter=None):
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.begin(self.template, basepath, render_options(highlighter))
+        generate_pages_recursive(self.content, self.template, self.dest, basepath, manifest,
+                                 highlighter=highlighter)
+        removed = manifest.prune(self.dest)
+        manifest.save()
+        return manifest, removed
+
+    def test_hash_file(self):
+        path = os.path.join(self.content, "index.md")
+        self.assertEqual(hash_file(path), hash_file(path))
+        self.assertEqual(len(hash_file(path)), 64)
+
+    def test_load_missing_manifest(self):
+        manifest = BuildManifest.load(os.path.join(self.root, "missing.json"))
+        self.assertEqual(manifest.pages, {})
+
+    def test_first_build_records_pages(self):
+        manifest, removed = self._build()
+        self.assertEqual(removed, [])
+        self.assertEqual(len(manifest.pages), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+
+    def test_unchanged_pages_are_skipped(self):
+        self._build()
+        output = os.path.join(self.dest, "index.html")
+        self._write(output, "sentinel")
+        self._build()
+        self.assertEqual(self._read(output), "sentinel")
+
+    def test_changed_page_is_rebuilt(self):
+        self._build()
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\nChanged")
+        self._build()
+        self.assertIn("Changed", self._read(self.dest, "index.html"))
+
+    def test_missing_output_is_rebuilt(self):
+        self._build()
+        output = os.path.join(self.dest, "index.html")
+        os.remove(output)
+        self._build()
+        self.assertTrue(os.path.exists(output))
+
+    def test_template_change_rebuilds_everything(self):
+        self._build()
+        self._write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self._build()
+        self.assertTrue(self._read(self.dest, "blog", "post.html").startswith("<h1>Post</h1>"))
+
+    def test_front_matter_template_change_rebuilds_its_pages(self):
+        self._write(os.path.join(self.root, "post.html"), "<v1>{{ Content }}")
+        self._write(os.path.join(self.content, "blog", "post.md"), "---\ntemplate: post.html\n---\n# Post\n\nBody")
+        manifest, _ = self._build()
+        self.assertEqual(list(manifest.pages[os.path.join(self.content, "blog", "post.md")]["templates"]),
+                         [os.path.join(self.root, "post.html")])
+        self._write(os.path.join(self.dest, "index.html"), "sentinel")
+        self._write(os.path.join(self.root, "post.html"), "<v2>{{ Content }}")
+        self._build()
+        self.assertTrue(self._read(self.dest, "blog", "post.html").startswith("<v2>"))
+        self.assertEqual(self._read(self.dest, "index.html"), "sentinel")
+
+    def test_front_matter_template_reads_the_listing(self):
+        self._write(os.path.join(self.root, "list.html"), "<ul>{% for p in pages %}<li>{{ p.title }}</li>{% endfor %}</ul>")
+        self._write(os.path.join(self.content, "index.md"), "---\ntemplate: list.html\n---\n# Home\n\nWelcome")
+        self._build()
+        self.assertEqual(self._read(self.dest, "index.html"), "<ul><li>Home</li><li>Post</li></ul>")
+        self._write(os.path.join(self.content, "blog", "post.md"), "# Renamed\n\nBody")
+        self._build()
+        self.assertEqual(self._read(self.dest, "index.html"), "<ul><li>Home</li><li>Renamed</li></ul>")
+
+    def test_basepath_change_rebuilds_everything(self):
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post)")
+        self._build()
+        self._build("/site/")
+        self.assertIn('href="/site/blog/post"', self._read(self.dest, "index.html"))
+
+    def test_highlight_change_rebuilds_everything(self):
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\n```py\npass\n```")
+        self._build()
+        self._build(highlighter=Highlighter())
+        self.assertIn('<span class="tok-keyword">pass</span>', self._read(self.dest, "index.html"))
+
+    def test_generator_change_rebuilds_everything(self):
+        self._build()
+        self._write(os.path.join(self.dest, "index.html"), "old output")
+        self._build()
+        self.assertEqual(self._read(self.dest, "index.html"), "old output")
+        with mock.patch.object(manifest_module, "GENERATOR_VERSION", "next"):
+            self._build()
+        self.assertIn("<title>Home</title>", self._read(self.dest, "index.html"))
+
+    def test_stale_outputs_are_pruned(self):
+        self._build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        manifest, removed = self._build()
+        self.assertEqual(removed, [os.path.join(self.dest, "blog", "post.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+        self.assertEqual(len(manifest.pages), 1)
+
+    def test_pruning_every_page_keeps_the_output_folder(self):
+        self._build()
+        os.remove(os.path.join(self.content, "index.md"))
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        _, removed = self._build()
+        self.assertEqual(len(removed), 2)
+        self.assertEqual(os.listdir(self.dest), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
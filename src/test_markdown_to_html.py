@@ -1,5 +1,11 @@
+import os
+import tempfile
 import unittest
-from process_markdown import markdown_to_html_node
+from unittest import mock
+
+import process_markdown
+from highlight import Highlighter
+from process_markdown import generate_page, markdown_to_html_node, page_metadata, stream_markdown_to_html_node
 
 class TestMarkdownToHtmlNode(unittest.TestCase):
     def test_paragraphs_and_inline(self):
@@ -32,6 +38,14 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_basepath_prefixes_root_relative_urls(self):
+        md = "[home](/blog/tom) ![pic](/images/tom.png) [ext](https://boot.dev)"
+        node = markdown_to_html_node(md, "/site/")
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><a href="/site/blog/tom">home</a> <img src="/site/images/tom.png" alt="pic"></img> <a href="https://boot.dev">ext</a></p></div>',
+        )
+
 
 class TestExtractTitle(unittest.TestCase):
     def test_extract_title_basic(self):
@@ -70,5 +84,79 @@ class TestExtractTitle(unittest.TestCase):
         with self.assertRaises(ValueError):
             extract_title(md)
 
+    def test_code_block_language_class(self):
+        md = "```python extra\nprint(`x`)\n\nprint(2)\n```"
+        self.assertEqual(markdown_to_html_node(md).to_html(),
+                         '<div><pre><code class="language-python">print(`x`)\n\nprint(2)\n</code></pre></div>')
+
+    def test_code_is_escaped_once(self):
+        md = "```\nif a < b && c: print('<p>&amp;')\n```"
+        self.assertEqual(markdown_to_html_node(md).to_html(),
+                         "<div><pre><code>if a &lt; b &amp;&amp; c: print('&lt;p&gt;&amp;amp;')\n</code></pre></div>")
+        highlighted = markdown_to_html_node("```py\nx = '<&>'\n```", highlighter=Highlighter()).to_html()
+        self.assertIn('<span class="tok-string">\'&lt;&amp;&gt;\'</span>', highlighted)
+
+    def test_link_text_and_url_are_escaped(self):
+        md = '[a <b>](/x?a=1&b="2")'
+        self.assertEqual(markdown_to_html_node(md).to_html(),
+                         '<div><p><a href="/x?a=1&amp;b=&quot;2&quot;">a &lt;b&gt;</a></p></div>')
+
+    def test_generate_page_escapes_title(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "page.md")
+            template = os.path.join(root, "template.html")
+            with open(source, 'w') as f:
+                f.write("# Fish & <Chips>\n\ntext")
+            with open(template, 'w') as f:
+                f.write("<title>{{ Title }}</title>")
+            generate_page(source, template, os.path.join(root, "page.html"))
+            with open(os.path.join(root, "page.html")) as f:
+                self.assertEqual(f.read(), "<title>Fish &amp; &lt;Chips&gt;</title>")
+
+    def test_streaming_matches_markdown_to_html_node(self):
+        md = "# Title\n\nSome **bold** [link](/x)\n\n```\ncode\n\nblock\n```\n\n> quote\n\n1. one\n2. two\n"
+        lines = iter(md.splitlines(keepends=True))
+        self.assertEqual(stream_markdown_to_html_node(lines, "/site/").to_html(),
+                         markdown_to_html_node(md, "/site/").to_html())
+
+    def test_streaming_empty_document_raises(self):
+        with self.assertRaises(ValueError):
+            stream_markdown_to_html_node(iter(["\n", "\n"])).to_html()
+
+    def test_generate_page_streams_large_sources(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "page.md")
+            template = os.path.join(root, "template.html")
+            with open(source, 'w') as f:
+                f.write("Intro\n\n# Big Page\n\n" + "A *line* of `text`\n\n" * 100)
+            with open(template, 'w') as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            whole = generate_page(source, template, os.path.join(root, "whole.html"))
+            with mock.patch.object(process_markdown, "STREAMING_THRESHOLD", 0):
+                streamed = generate_page(source, template, os.path.join(root, "streamed.html"))
+            with open(os.path.join(root, "whole.html")) as f, open(os.path.join(root, "streamed.html")) as g:
+                self.assertEqual(f.read(), g.read())
+            self.assertEqual(whole, streamed)
+
+
+class TestPageMetadata(unittest.TestCase):
+    def test_summary_is_first_paragraph_as_plain_text(self):
+        md = "# Title\n\n> quoted\n\nSome **bold** and [a link](/x)\nwrapped.\n\nLater paragraph"
+        self.assertEqual(page_metadata(md, "Title"),
+                         {"title": "Title", "summary": "Some bold and a link wrapped.", "words": 12})
+
+    def test_summary_skips_navigation_and_alt_text(self):
+        md = "# Title\n\n[< Back Home](/)\n\n![alt text](/a.png)\n\n![icon](/i.png) Real [text](/t) here"
+        self.assertEqual(page_metadata(md, "Title")["summary"], "Real text here")
+
+    def test_long_summary_is_cut_at_a_word(self):
+        summary = page_metadata("word " * 100, "T")["summary"]
+        self.assertLessEqual(len(summary), process_markdown.SUMMARY_LENGTH + 1)
+        self.assertTrue(summary.endswith("word…"))
+
+    def test_no_paragraph(self):
+        self.assertEqual(page_metadata("# Only a heading", "Only a heading")["summary"], "")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,5 @@
+import io
+import sys
 import unittest
 
 from parentnode import ParentNode
@@ -158,5 +160,36 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_iter_html_fragments(self):
+        """Test iter_html yields tags and leaves in document order"""
+        parent = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")], {"class": "x"})
+        self.assertEqual(
+            list(parent.iter_html()),
+            ['<p class="x">', "<b>Bold</b>", " text", "</p>"],
+        )
+
+    def test_write_html_streams_to_file(self):
+        """Test write_html writes the same markup as to_html"""
+        parent = ParentNode("div", [ParentNode("p", [LeafNode("i", "a")]), LeafNode("b", "c")])
+        buffer = io.StringIO()
+        parent.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), parent.to_html())
+
+    def test_to_html_nesting_deeper_than_recursion_limit(self):
+        """Test serialization does not recurse per level"""
+        depth = sys.getrecursionlimit() * 2
+        node = LeafNode("span", "core")
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<div>" * depth + "<span>core</span>"))
+        self.assertTrue(html.endswith("</div>" * depth))
+
+    def test_iter_html_invalid_child_raises(self):
+        """Test validation errors surface from nested ParentNodes"""
+        parent = ParentNode("div", [LeafNode("b", "ok"), ParentNode("p", [])])
+        with self.assertRaises(ValueError):
+            list(parent.iter_html())
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,8 @@
+import io
 import unittest
 
 from textnode import TextNode, TextType
-from process_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks
+from process_markdown import split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, stream_blocks, _iter_blocks
 
 
 class TestSplitNodesDelimiter(unittest.TestCase):
@@ -321,6 +322,16 @@ class TestExtractMarkdown(unittest.TestCase):
         # The regex actually captures the full content including nested brackets
         self.assertListEqual([("Link with [brackets]", "https://example.com")], matches)
 
+    def test_extract_markdown_links_parentheses_in_url(self):
+        text = "See [Foo](https://en.wikipedia.org/wiki/Foo_(bar)) and [x](y)"
+        matches = extract_markdown_links(text)
+        self.assertListEqual([("Foo", "https://en.wikipedia.org/wiki/Foo_(bar)"), ("x", "y")], matches)
+
+    def test_extract_markdown_images_unbalanced_brackets(self):
+        text = "a [stray ![alt [1]](a.png) ] b"
+        matches = extract_markdown_images(text)
+        self.assertListEqual([("alt [1]", "a.png")], matches)
+
     def test_extract_markdown_images_special_urls(self):
         """Test images with special characters in URLs"""
         text = "![test](https://example.com/path?param=value&other=123#anchor)"
@@ -605,6 +616,20 @@ class TestSplitNodesLink(unittest.TestCase):
             TextNode("baz", TextType.IMAGE, "baz.jpg")
         ], new_nodes)
 
+    def test_split_links_nested_brackets_and_parentheses(self):
+        node = TextNode("[a [b] c](/x_(y)) then [d](e)", TextType.TEXT)
+        self.assertListEqual([
+            TextNode("a [b] c", TextType.LINK, "/x_(y)"),
+            TextNode(" then ", TextType.TEXT),
+            TextNode("d", TextType.LINK, "e")
+        ], split_nodes_link([node]))
+
+    def test_split_links_many_links(self):
+        node = TextNode("[a](b) " * 1000, TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(len(new_nodes), 2000)
+        self.assertEqual(new_nodes[-2], TextNode("a", TextType.LINK, "b"))
+
     def test_split_links_no_text_nodes(self):
         nodes = [TextNode("foo", TextType.BOLD), TextNode("bar", TextType.ITALIC)]
         new_nodes = split_nodes_link(nodes)
@@ -738,6 +763,46 @@ class TestTextToTextnodes(unittest.TestCase):
             TextNode(r"This is a literal \*asterisk\* and \_underscore\_", TextType.TEXT)
         ], new_nodes)
 
+    def test_text_to_textnodes_unmatched_delimiter_raises(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is **unclosed bold")
+
+    def test_text_to_textnodes_delimiters_inside_code_are_literal(self):
+        new_nodes = text_to_textnodes("Use `a_b**c` here")
+        self.assertListEqual([
+            TextNode("Use ", TextType.TEXT),
+            TextNode("a_b**c", TextType.CODE),
+            TextNode(" here", TextType.TEXT)
+        ], new_nodes)
+
+    def test_text_to_textnodes_underscores_in_link_url(self):
+        new_nodes = text_to_textnodes("See [the_docs](https://example.com/a_b_c)")
+        self.assertListEqual([
+            TextNode("See ", TextType.TEXT),
+            TextNode("the_docs", TextType.LINK, "https://example.com/a_b_c")
+        ], new_nodes)
+
+    def test_text_to_textnodes_linked_image_keeps_the_image(self):
+        new_nodes = text_to_textnodes("[![alt](src.png)](href)")
+        self.assertListEqual([
+            TextNode("[", TextType.TEXT),
+            TextNode("alt", TextType.IMAGE, "src.png"),
+            TextNode("](href)", TextType.TEXT)
+        ], new_nodes)
+
+    def test_text_to_textnodes_escaped_bracket_is_text(self):
+        new_nodes = text_to_textnodes(r"\[not](a link) [a](b)")
+        self.assertListEqual([
+            TextNode(r"\[not](a link) ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "b")
+        ], new_nodes)
+
+    def test_text_to_textnodes_unmatched_bracket_is_text(self):
+        new_nodes = text_to_textnodes("a [b and ![c] d")
+        self.assertListEqual([
+            TextNode("a [b and ![c] d", TextType.TEXT)
+        ], new_nodes)
+
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -900,6 +965,34 @@ Another paragraph."""
         ]
         self.assertEqual(blocks, expected)
 
+    def test_markdown_to_blocks_fence_with_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\n\nsecond\n```\n\nOutro"
+        self.assertEqual(markdown_to_blocks(md), ["Intro", "```\nfirst\n\n\nsecond\n```", "Outro"])
+
+    def test_stream_blocks_from_file(self):
+        md = "# Title\n\n\n  para one\nline two  \n \n\n```\ncode\n\nmore\n```\n- a\n- b\n"
+        blocks = list(stream_blocks(io.StringIO(md)))
+        self.assertEqual(blocks, ["# Title", "para one\nline two", "```\ncode\n\nmore\n```", "- a\n- b"])
+
+    def test_markdown_to_blocks_fence_interrupts_paragraph(self):
+        md = "Text before\n```py\nx = 1\n\ny = `2`\n```\nText after"
+        self.assertEqual(markdown_to_blocks(md), ["Text before", "```py\nx = 1\n\ny = `2`\n```", "Text after"])
+
+    def test_stream_blocks_matches_markdown_to_blocks(self):
+        md = "a\n\n\n\nb\nc\n \n\n\td\n\n"
+        self.assertEqual(list(stream_blocks(io.StringIO(md))), markdown_to_blocks(md))
+
+    def test_stream_blocks_is_lazy(self):
+        def lines():
+            yield "one\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+        self.assertEqual(next(stream_blocks(lines())), "one")
+
+    def test_iter_blocks_start_lines(self):
+        md = "\n# Title\n\npara\nmore\n\n\n```\nx\n\ny\n```\n\nend"
+        self.assertEqual([line for line, _ in _iter_blocks(md.split("\n"))], [2, 4, 8, 14])
+
 class TestExtractTitle(unittest.TestCase):
     def test_extract_title_basic(self):
         from process_markdown import extract_title
@@ -0,0 +1,78 @@
+import os
+import unittest
+
+import profiling
+from build import generate_pages_recursive
+from fixtures import TempDirTestCase
+from highlight import Highlighter
+
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_stage_is_noop_when_disabled(self):
+        self.assertIsNone(profiling.active())
+        with profiling.stage("read"):
+            pass
+
+    def test_stage_accumulates_per_page(self):
+        profiler = profiling.enable()
+        with profiler.page("a.md"):
+            for _ in range(3):
+                with profiling.stage("read"):
+                    pass
+        with profiler.page("b.md"):
+            with profiling.stage("write"):
+                pass
+        report = profiler.report()
+        self.assertEqual(report["pages"]["a.md"]["read"]["calls"], 3)
+        self.assertEqual(report["aggregate"]["read"]["calls"], 3)
+        self.assertEqual(list(report["aggregate"]), ["read", "write"])
+        self.assertEqual(len(report["slowest_pages"]), 2)
+
+    def test_merge_adds_worker_timings(self):
+        profiler = profiling.Profiler()
+        profiler.merge("a.md", {"read": [0.5, 1]})
+        profiler.merge("a.md", {"read": [0.25, 2]})
+        self.assertEqual(profiler.report()["pages"]["a.md"]["read"], {"seconds": 0.75, "calls": 3})
+
+    def test_format_table(self):
+        profiler = profiling.Profiler()
+        profiler.merge("a.md", {"to_html": [0.1, 1]})
+        table = profiler.format_table()
+        self.assertIn("to_html", table)
+        self.assertIn("a.md", table)
+
+
+class TestProfiledBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = self._write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        for name in ("a", "b"):
+            self._write(os.path.join(self.content, f"{name}.md"),
+                        f"# {name}\n\nSome **bold** text\n\n- one\n- two\n\n```python\nx = 1\n```")
+
+    def tearDown(self):
+        profiling.disable()
+
+    def _assert_all_stages(self, profiler):
+        for path in (os.path.join(self.content, "a.md"), os.path.join(self.content, "b.md")):
+            self.assertEqual(set(profiler.report()["pages"][path]), set(profiling.STAGES))
+        self.assertEqual(profiler.report()["aggregate"]["block_to_block_type"]["calls"], 8)
+
+    def test_serial_build_records_every_stage(self):
+        profiler = profiling.enable()
+        generate_pages_recursive(self.content, self.template, self.dest, highlighter=Highlighter())
+        self._assert_all_stages(profiler)
+
+    def test_parallel_build_merges_worker_stages(self):
+        profiler = profiling.enable()
+        generate_pages_recursive(self.content, self.template, self.dest, jobs=2, highlighter=Highlighter())
+        self._assert_all_stages(profiler)
+
+
+if __name__ == "__main__":
+    unittest.main()
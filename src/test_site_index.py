@@ -0,0 +1,78 @@
+import json
+import os
+import unittest
+
+from build import generate_pages_recursive
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+from site_index import FEED_NAME, SEARCH_INDEX_NAME, SITEMAP_NAME, page_url, write_site_index
+
+
+class TestSiteIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self._write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self._write(os.path.join(self.content, "index.md"), "# Home & Away\n\nWelcome _home_")
+        self._write(os.path.join(self.content, "blog", "old", "index.md"), "# Old\n\nFirst post", mtime=1000)
+        self._write(os.path.join(self.content, "blog", "new", "index.md"), "# New\n\nSecond post", mtime=2000)
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+
+    def _build(self):
+        self.manifest.begin(self.template, "/site/")
+        generate_pages_recursive(self.content, self.template, self.dest, "/site/", self.manifest)
+        return write_site_index(self.manifest, self.content, self.dest, "/site/", "https://example.com/")
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs", "/"), "/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs", "/b/"), "/b/blog/tom/")
+        self.assertEqual(page_url(os.path.join("docs", "about.html"), "docs", "/"), "/about.html")
+
+    def test_artifacts(self):
+        self.assertEqual(len(self._build()), 3)
+        sitemap = self._read(self.dest, SITEMAP_NAME)
+        self.assertIn("<loc>https://example.com/site/</loc>", sitemap)
+        self.assertIn("<loc>https://example.com/site/blog/old/</loc><lastmod>1970-01-01</lastmod>", sitemap)
+
+        feed = self._read(self.dest, FEED_NAME)
+        self.assertIn("<title>Home &amp; Away</title>", feed)
+        self.assertIn("<description>Welcome home</description>", feed)
+        self.assertLess(feed.index("<title>New</title>"), feed.index("<title>Old</title>"))
+        self.assertIn("<pubDate>Thu, 01 Jan 1970 00:33:20 GMT</pubDate>", feed)
+
+        index = json.loads(self._read(self.dest, SEARCH_INDEX_NAME))
+        self.assertEqual([entry["url"] for entry in index], ["/site/", "/site/blog/new/", "/site/blog/old/"])
+        self.assertEqual(index[1], {"url": "/site/blog/new/", "title": "New", "summary": "Second post", "words": 4,
+                                    "tags": []})
+
+    def test_front_matter_date_orders_the_feed(self):
+        self._write(os.path.join(self.content, "blog", "old", "index.md"),
+                    "---\ntitle: Old\ndate: 2030-01-01\ntags: [a, b]\n---\nFirst post", mtime=1000)
+        self._build()
+        feed = self._read(self.dest, FEED_NAME)
+        self.assertLess(feed.index("<title>Old</title>"), feed.index("<title>New</title>"))
+        self.assertIn("<pubDate>Tue, 01 Jan 2030 00:00:00 GMT</pubDate>", feed)
+        index = json.loads(self._read(self.dest, SEARCH_INDEX_NAME))
+        self.assertEqual(index[2]["tags"], ["a", "b"])
+
+    def test_incremental_update(self):
+        self._build()
+        self.assertEqual(self._build(), [])
+        self._write(os.path.join(self.content, "blog", "old", "index.md"), "# Old\n\nRevised post", mtime=1000)
+        written = self._build()
+        self.assertEqual(sorted(os.path.basename(path) for path in written), [FEED_NAME, SEARCH_INDEX_NAME])
+        self.assertIn("Revised post", self._read(self.dest, FEED_NAME))
+
+    def test_removed_page_leaves_the_index(self):
+        self._build()
+        os.remove(os.path.join(self.content, "blog", "old", "index.md"))
+        self._build()
+        self.manifest.prune(self.dest)
+        write_site_index(self.manifest, self.content, self.dest, "/site/", "https://example.com")
+        self.assertNotIn("/blog/old/", self._read(self.dest, SITEMAP_NAME))
+
+
+if __name__ == "__main__":
+    unittest.main()
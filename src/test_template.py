@@ -0,0 +1,130 @@
+import io
+import os
+import tempfile
+import unittest
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from template import Markup, Template, TemplateError, load_template, section_layout, template_files
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(
+            template.render(Title="Home", Content=Markup("<p>Hi</p>")),
+            "<title>Home</title><main><p>Hi</p></main>",
+        )
+
+    def test_render_repeated_slot(self):
+        template = Template("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render(Title="x"), "x|x")
+
+    def test_render_missing_value_left_as_written(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Other }}")
+        self.assertEqual(template.render(Title="x"), "<h1>x</h1>{{ Other }}")
+
+    def test_no_slots(self):
+        self.assertEqual(Template("<p>static</p>").render(Title="x"), "<p>static</p>")
+
+    def test_basepath_rewrites_static_parts(self):
+        template = Template('<link href="/index.css"><img src="/a.png">{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render(Content=Markup('<a href="/raw">')),
+            '<link href="/site/index.css"><img src="/site/a.png"><a href="/raw">',
+        )
+
+    def test_default_basepath_leaves_links(self):
+        template = Template('<link href="/index.css">')
+        self.assertEqual(template.render(), '<link href="/index.css">')
+
+    def test_write_streams_nodes(self):
+        template = Template('<title>{{ Title }}</title><a href="/">{{ Content }}</a>', "/site/")
+        content = ParentNode("p", [LeafNode("b", "hi")])
+        buffer = io.StringIO()
+        template.write(buffer, Title="Home", Content=content)
+        self.assertEqual(buffer.getvalue(), template.render(Title="Home", Content=content))
+        self.assertEqual(buffer.getvalue(), '<title>Home</title><a href="/site/"><p><b>hi</b></p></a>')
+
+    def test_load_template_caches_until_modified(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, 'w') as f:
+                f.write("<h1>{{ Title }}</h1>")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            self.assertIsNot(load_template(path, "/site/"), first)
+            with open(path, 'w') as f:
+                f.write("<h2>{{ Title }}</h2>")
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+            self.assertEqual(load_template(path).render(Title="x"), "<h2>x</h2>")
+
+    def test_dotted_names_and_escape(self):
+        template = Template("{{ page.title | escape }} {{ page.missing }} {{ page.tags }}")
+        self.assertEqual(template.render(page={"title": "a < b", "tags": ["x"]}),
+                         "a &lt; b {{ page.missing }} ['x']")
+
+    def test_strings_are_escaped_unless_safe(self):
+        template = Template("{% for p in pages %}{{ p.title }}{% endfor %}|{{ Title }}|{{ html | safe }}|{{ Content }}")
+        self.assertEqual(
+            template.render(pages=[{"title": "<script>x</script>"}], Title="a & b", html="<b>x</b>",
+                            Content=Markup("<p>body</p>")),
+            "&lt;script&gt;x&lt;/script&gt;|a &amp; b|<b>x</b>|<p>body</p>",
+        )
+
+    def test_loops_and_conditions(self):
+        template = Template(
+            "{% for post in pages %}{% if post.draft %}({{ post.title }}){% else %}{{ post.title }}{% endif %},"
+            "{% endfor %}{% if not pages %}none{% endif %}")
+        self.assertEqual(template.render(pages=[{"title": "a"}, {"title": "b", "draft": True}]), "a,(b),")
+        self.assertEqual(template.render(pages=[]), "none")
+        self.assertEqual(template.render(), "none")
+        self.assertEqual(template.names, {"pages"})
+
+    def test_errors_name_the_line(self):
+        cases = [
+            ("a\n{% for x in xs %}", "<template>:2: unclosed {% for %}"),
+            ("{% endif %}", "<template>:1: unexpected {% endif %}"),
+            ("{% else %}", "<template>:1: {% else %} outside {% if %}"),
+            ("\n\n{% block x %}", "<template>:3: unknown statement 'block x'"),
+            ("{{ a + b }}", "<template>:1: cannot read 'a + b'"),
+            ("{{ a | upper }}", "<template>:1: unknown filter 'upper'"),
+        ]
+        for source, message in cases:
+            with self.subTest(source):
+                with self.assertRaises(TemplateError) as raised:
+                    Template(source)
+                self.assertEqual(str(raised.exception), message)
+
+    def test_includes_and_layouts(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "partials"))
+            os.makedirs(os.path.join(root, "layouts"))
+            path = os.path.join(root, "template.html")
+            nav = os.path.join(root, "partials", "nav.html")
+            layout = os.path.join(root, "layouts", "blog.html")
+            for file, text in ((path, '{% include "partials/nav.html" %}{{ Content }}'),
+                               (nav, '<a href="/">{{ Title }}</a>'),
+                               (layout, '<main>{% include "../partials/nav.html" %}</main>')):
+                with open(file, 'w') as f:
+                    f.write(text)
+            self.assertEqual(load_template(path, "/site/").render(Title="x", Content="y"),
+                             '<a href="/site/">x</a>y')
+            self.assertEqual(section_layout(path, "blog"), layout)
+            self.assertIsNone(section_layout(path, "docs"))
+            self.assertEqual(template_files(path), [path, nav, layout])
+
+            with open(nav, 'w') as f:
+                f.write("<nav>{{ Title }}</nav>")
+            os.utime(nav, ns=(0, os.stat(nav).st_mtime_ns + 1_000_000))
+            self.assertEqual(load_template(path, "/site/").render(Title="x", Content="y"), "<nav>x</nav>y")
+
+            with open(nav, 'w') as f:
+                f.write('{% include "nav.html" %}')
+            with self.assertRaisesRegex(TemplateError, "nav.html:1: nav.html includes itself"):
+                load_template(nav)
+
+
+if __name__ == "__main__":
+    unittest.main()
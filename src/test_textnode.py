@@ -73,6 +73,12 @@ class TestTextNode(unittest.TestCase):
             node = TextNode("test text", text_type)
             self.assertEqual(node.text_type, text_type)
 
+    def test_slots_no_instance_dict(self):
+        node = TextNode("slotted", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
     def test_empty_text(self):
         node = TextNode("", TextType.TEXT)
         self.assertEqual(node.text, "")
@@ -199,7 +205,7 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         html_node = text_node_to_html_node(text_node)
         
         self.assertEqual(html_node.value, "Hello & <world>")
-        self.assertEqual(html_node.to_html(), "<b>Hello & <world></b>")
+        self.assertEqual(html_node.to_html(), "<b>Hello &amp; &lt;world&gt;</b>")
 
     def test_text_node_to_html_node_link_with_special_chars_in_url(self):
         """Test converting LINK TextNode with special characters in URL"""
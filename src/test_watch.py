@@ -0,0 +1,133 @@
+import functools
+import os
+import threading
+import unittest
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from build import generate_pages_recursive
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+from watch import LiveReload, LiveReloadHandler, SiteWatcher
+
+
+class TestSiteWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self._write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self._write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nBody")
+        self._write(os.path.join(self.static, "index.css"), "body {}")
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        self.manifest.begin(self.template, "/")
+        generate_pages_recursive(self.content, self.template, self.dest, "/", self.manifest)
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.dest, "/", self.manifest)
+
+    def _write(self, path, text):
+        path = super()._write(path, text)
+        # Make every write visible to mtime polling regardless of timestamp granularity
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        return path
+
+    def test_no_change(self):
+        self.assertFalse(self.watcher.poll())
+
+    def test_changed_page_only_is_regenerated(self):
+        self._write(os.path.join(self.dest, "index.html"), "sentinel")
+        self._write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nEdited")
+        self.assertTrue(self.watcher.poll())
+        self.assertIn("Edited", self._read(self.dest, "blog", "post.html"))
+        self.assertEqual(self._read(self.dest, "index.html"), "sentinel")
+
+    def test_new_and_removed_pages(self):
+        self._write(os.path.join(self.content, "about.md"), "# About\n\nUs")
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.assertTrue(self.watcher.poll())
+        self.assertIn("Us", self._read(self.dest, "about.html"))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+        self.assertNotIn(os.path.join(self.content, "blog", "post.md"), self.manifest.pages)
+
+    def test_page_turned_draft_is_removed(self):
+        self._write(os.path.join(self.content, "blog", "post.md"), "---\ndraft: true\n---\n# Post\n\nBody")
+        self.assertTrue(self.watcher.poll())
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "post.html")))
+        self.assertNotIn(os.path.join(self.content, "blog", "post.md"), self.manifest.pages)
+
+    def test_template_change_regenerates_all(self):
+        self._write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertTrue(self.watcher.poll())
+        self.assertTrue(self._read(self.dest, "index.html").startswith("<h1>Home</h1>"))
+        self.assertTrue(self._read(self.dest, "blog", "post.html").startswith("<h1>Post</h1>"))
+
+    def test_partial_change_regenerates_all(self):
+        partial = os.path.join(self.root, "nav.html")
+        self._write(partial, "<nav></nav>")
+        self._write(self.template, '{% include "nav.html" %}{{ Content }}')
+        self.assertTrue(self.watcher.poll())
+        self._write(partial, "<nav>{{ Title }}</nav>")
+        self.assertTrue(self.watcher.poll())
+        self.assertTrue(self._read(self.dest, "index.html").startswith("<nav>Home</nav>"))
+        self.assertTrue(self._read(self.dest, "blog", "post.html").startswith("<nav>Post</nav>"))
+
+    def test_front_matter_template_change_regenerates_its_pages(self):
+        post_template = os.path.join(self.root, "post.html")
+        self._write(post_template, "<v1>{{ Content }}")
+        self._write(os.path.join(self.content, "blog", "post.md"), "---\ntemplate: post.html\n---\n# Post\n\nBody")
+        self.assertTrue(self.watcher.poll())
+        self.assertTrue(self._read(self.dest, "blog", "post.html").startswith("<v1>"))
+        self._write(os.path.join(self.dest, "index.html"), "sentinel")
+        self._write(post_template, "<v2>{{ Content }}")
+        self.assertTrue(self.watcher.poll())
+        self.assertTrue(self._read(self.dest, "blog", "post.html").startswith("<v2>"))
+        self.assertEqual(self._read(self.dest, "index.html"), "sentinel")
+
+    def test_page_change_updates_listing_on_every_page(self):
+        self._write(self.template, "{% for page in pages %}{{ page.title }},{% endfor %}")
+        self.assertTrue(self.watcher.poll())
+        self._write(os.path.join(self.content, "blog", "post.md"), "# Renamed\n\nBody")
+        self.assertTrue(self.watcher.poll())
+        self.assertEqual(self._read(self.dest, "index.html"), "Home,Renamed,")
+
+    def test_static_change_is_copied(self):
+        self._write(os.path.join(self.static, "index.css"), "body { color: red }")
+        self.assertTrue(self.watcher.poll())
+        self.assertEqual(self._read(self.dest, "index.css"), "body { color: red }")
+
+
+class TestLiveReloadServer(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self._write("index.html", "<html><body><p>Hi</p></body></html>")
+        self.live_reload = LiveReload()
+        handler_class = type("Handler", (LiveReloadHandler,), {"live_reload": self.live_reload})
+        handler = functools.partial(handler_class, directory=self.root)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get(self, path):
+        with urllib.request.urlopen(self.base + path, timeout=5) as response:
+            return response.read().decode()
+
+    def test_script_injected_before_body_end(self):
+        body = self._get("/")
+        self.assertTrue(body.startswith("<html><body><p>Hi</p><script>"))
+        self.assertTrue(body.endswith("</script>\n</body></html>"))
+
+    def test_long_poll_returns_new_version(self):
+        threading.Timer(0.05, self.live_reload.bump).start()
+        self.assertEqual(self._get("/__livereload?since=0"), "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+import functools
+import logging
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from assets import sync_tree
+from manifest import remove_output
+from build import listing_hash, page_hash, render_options, site_listing, uses_listing
+from frontmatter import load_front_matter
+from process_markdown import collect_pages, generate_page, page_dest_path, page_template
+from site_index import page_section, write_site_index
+from template import LAYOUTS_DIR, load_template, template_files
+
+logger = logging.getLogger(__name__)
+
+RELOAD_PATH = "/__livereload"
+
+RELOAD_SCRIPT = """<script>
+(function () {
+  var version = %d;
+  function poll() {
+    fetch("%s?since=" + version, {cache: "no-store"})
+      .then(function (response) { return response.text(); })
+      .then(function (text) { if (+text !== version) { location.reload(); } else { poll(); } })
+      .catch(function () { setTimeout(poll, 1000); });
+  }
+  poll();
+})();
+</script>
+"""
+
+
+class LiveReload:
+    """A build counter that browsers long-poll to find out when to reload."""
+
+    def __init__(self):
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def bump(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, since, timeout=25.0):
+        """Blocks until the version moves past `since` or the timeout expires."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != since, timeout)
+            return self.version
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Serves the output folder, injecting the reload script into HTML pages."""
+
+    live_reload = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def end_headers(self):
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == RELOAD_PATH:
+            since = parse_qs(url.query).get("since", ["0"])[0]
+            version = self.live_reload.wait(int(since) if since.isdigit() else 0)
+            self._send(str(version).encode(), "text/plain")
+            return
+        path = self.translate_path(url.path)
+        if os.path.isdir(path) and url.path.endswith("/"):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        script = (RELOAD_SCRIPT % (self.live_reload.version, RELOAD_PATH)).encode()
+        index = body.rfind(b"</body>")
+        body = body + script if index == -1 else body[:index] + script + body[index:]
+        self._send(body, "text/html; charset=utf-8")
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def snapshot(paths):
+    """Returns {file path: (mtime, size)} for every file under the given paths."""
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for root, _, names in os.walk(path):
+            for name in names:
+                file_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class SiteWatcher:
+    """Polls the site sources and regenerates only what a change affects."""
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath="/", manifest=None,
+                 highlighter=None, site_url=None, drafts=False):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest = manifest
+        self.highlighter = highlighter
+        self.site_url = site_url
+        self.drafts = drafts
+        self._layouts_dir = os.path.join(os.path.dirname(template_path), LAYOUTS_DIR)
+        self._templates = self._load_templates()
+        self._site = None
+        # Source -> the template files it was last rendered from
+        self._page_templates = {}
+        if manifest is not None:
+            self._page_templates = {source: list(entry.get("templates", {}))
+                                    for source, entry in manifest.pages.items()}
+        self._files = snapshot(self._watched())
+
+    def _load_templates(self):
+        """Returns the files of the default template and the layouts; a broken template is logged."""
+        try:
+            return template_files(self.template_path)
+        except (OSError, ValueError) as e:
+            logger.error("Error loading templates: %s", e)
+            return [self.template_path]
+
+    def _listing_pages(self):
+        """Returns the sources last rendered with a template that reads the page listing."""
+        sources = set()
+        for source, paths in self._page_templates.items():
+            try:
+                if paths and uses_listing(load_template(paths[0], self.basepath)):
+                    sources.add(source)
+            except (OSError, ValueError):
+                continue
+        return sources
+
+    def _site_listing(self):
+        """Returns (site_listing, listing_hash), computed at most once per poll."""
+        if self._site is None:
+            site = site_listing(self.content_dir, self.dest_dir, self.basepath, self.drafts)
+            self._site = site, listing_hash(site)
+        return self._site
+
+    def _watched(self):
+        page_templates = {path for paths in self._page_templates.values() for path in paths}
+        return [self.content_dir, self.static_dir, self._layouts_dir] + self._templates + sorted(page_templates)
+
+    def poll(self):
+        """Applies every change since the last poll and returns True if the output changed."""
+        files = snapshot(self._watched())
+        changed = {path for path, stat in files.items() if self._files.get(path) != stat}
+        removed = set(self._files) - set(files)
+        self._files = files
+        if not changed and not removed:
+            return False
+
+        templates_changed = any(path in self._templates or _is_within(path, self._layouts_dir)
+                                for path in changed | removed)
+        if templates_changed:
+            self._templates = self._load_templates()
+            pages = collect_pages(self.content_dir, self.dest_dir)
+        else:
+            # Changed pages, and pages rendered from a changed template chosen in front matter
+            sources = {path for path in changed if self._is_page(path)}
+            sources.update(source for source, paths in self._page_templates.items()
+                           if not (changed | removed).isdisjoint(paths))
+            # Pages that list the others change whenever a page does
+            if any(self._is_page(path) for path in changed | removed):
+                sources |= self._listing_pages()
+            pages = [(path, page_dest_path(path, self.content_dir, self.dest_dir))
+                     for path in sorted(sources - removed)]
+        self._site = None
+        if self.manifest is not None:
+            try:
+                self.manifest.begin(self.template_path, self.basepath, render_options(self.highlighter))
+            except (OSError, ValueError) as e:
+                logger.error("Error loading templates: %s", e)
+        for from_path, dest_path in pages:
+            self._generate(from_path, dest_path)
+
+        for path in sorted(removed):
+            if self._is_page(path):
+                self._remove_page(path, page_dest_path(path, self.content_dir, self.dest_dir))
+        if any(self._is_asset(path) for path in changed | removed):
+            sync_tree(self.static_dir, self.dest_dir, self.manifest)
+        if self.manifest is not None:
+            if self.site_url:
+                write_site_index(self.manifest, self.content_dir, self.dest_dir, self.basepath, self.site_url)
+            self.manifest.save()
+        return True
+
+    def _remove_page(self, from_path, dest_path):
+        remove_output(dest_path, self.dest_dir)
+        self._page_templates.pop(from_path, None)
+        if self.manifest is not None:
+            self.manifest.pages.pop(from_path, None)
+
+    def _is_page(self, path):
+        return path.endswith('.md') and _is_within(path, self.content_dir)
+
+    def _is_asset(self, path):
+        return _is_within(path, self.static_dir)
+
+    def _generate(self, from_path, dest_path):
+        try:
+            front_matter = load_front_matter(from_path)
+            if not self.drafts and front_matter.get("draft", False):
+                self._remove_page(from_path, dest_path)
+                return
+            section = page_section(from_path, self.content_dir)
+            template = load_template(page_template(self.template_path, front_matter, section), self.basepath)
+            site, site_hash = self._site_listing() if uses_listing(template) else (None, None)
+            metadata = generate_page(from_path, self.template_path, dest_path, self.basepath,
+                                     highlighter=self.highlighter, section=section, site=site)
+            templates = template.files
+        except Exception as e:
+            logger.error("Error generating %s: %s", from_path, e)
+            return
+        logger.debug("Generated %s from %s", dest_path, from_path)
+        self._page_templates[from_path] = templates
+        if self.manifest is not None:
+            self.manifest.record(from_path, page_hash(from_path, site_hash), dest_path, metadata, templates)
+
+
+def _is_within(path, directory):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(directory)]) == os.path.abspath(directory)
+
+
+def serve(watcher, port=8888, interval=0.1):
+    """Serves the output folder and rebuilds on change until interrupted."""
+    live_reload = LiveReload()
+    handler_class = type("Handler", (LiveReloadHandler,), {"live_reload": live_reload})
+    handler = functools.partial(handler_class, directory=watcher.dest_dir)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info("Serving %s at http://localhost:%d/ (Ctrl+C to stop)", watcher.dest_dir, port)
+    try:
+        while True:
+            if watcher.poll():
+                live_reload.bump()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()